@@ -5,11 +5,15 @@ import os
 import threading
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from ..config import AppConfig
 from ..resources import resource_path
 from ..settings import resolve_path_setting
 
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +26,11 @@ class EmbeddingConfig:
     model_id: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
     model_dirname: str = "paraphrase-multilingual-MiniLM-L12-v2"
     env_var: str = "MINDCHAT_EMBEDDING_MODEL_PATH"
+    backend: str = "onnx"
+    onnx_file_name: str = "onnx/model_qint8_avx512_vnni.onnx"
+    onnx_quantization: str = "avx512_vnni"
+    # torch バックエンド時の重み精度。"auto" は AVX-512 BF16 対応 CPU なら bf16、それ以外は fp32
+    dtype: str = "auto"
 
 
 class EmbeddingProvider:
@@ -31,6 +40,10 @@ class EmbeddingProvider:
         self._config = config
         self._settings = settings or EmbeddingConfig()
         self._model_path = self._resolve_model_path()
+        if self._model_path.exists():
+            # ローカルモデルがある場合は Hugging Face 側の通信を無効化しておく（遅延読み込み前に一度だけ）
+            os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+            os.environ.setdefault("HF_HUB_OFFLINE", "1")
         self._embedder: object | None = None
         self._init_error: str | None = None
         self._lock = threading.Lock()
@@ -59,10 +72,43 @@ class EmbeddingProvider:
             return "sentence-transformers is not available. Install the counseling dependencies."
         return None
 
-    def encode(self, texts: list[str]) -> list[list[float]]:
+    def prewarm(self) -> None:
+        """Load the model and run one throwaway encode so the first real query is fast."""
+
+        if not self._model_path.exists():
+            # 未取得のモデルを裏でダウンロードし始めないよう、ローカルにある場合だけ読み込む
+            return
+        try:
+            self._ensure_embedder().encode(["warmup"])
+        except Exception as exc:  # pragma: no cover - surfaced again on first real use
+            logger.debug("Embedding prewarm failed: %s", exc)
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        embedder = self._ensure_embedder()
+        # Chroma は ndarray をそのまま受け取れるため Python の list へは変換しない
+        return embedder.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+
+    def encode_list(self, texts: list[str]) -> list[list[float]]:
+        return self.encode(texts).tolist()
+
+    def encode_one(self, text: str) -> np.ndarray:
+        embedder = self._ensure_embedder()
+        # 単一文字列を渡すと 1 次元ベクトルが返るため外側のリストを作らずに済む
+        return embedder.encode(text, convert_to_numpy=True, normalize_embeddings=True)
+
+    def encode_batch(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
         embedder = self._ensure_embedder()
-        vectors = embedder.encode(texts)
-        return vectors.tolist() if hasattr(vectors, "tolist") else list(vectors)
+        # 長さ順に並べてパディングを最小化し、結果は元の順序へ戻す
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        vectors = embedder.encode(
+            [texts[index] for index in order],
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        restored = vectors.copy()
+        restored[order] = vectors
+        return restored
 
     def _ensure_embedder(self):
         if self._embedder is not None:
@@ -86,8 +132,6 @@ class EmbeddingProvider:
                 raise EmbeddingModelError(self._init_error) from exc
 
             if self._model_path.exists():
-                os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
-                os.environ.setdefault("HF_HUB_OFFLINE", "1")
                 self._embedder = self._load_local(SentenceTransformer)
                 return self._embedder
 
@@ -96,7 +140,18 @@ class EmbeddingProvider:
         return self._embedder
 
     def _load_local(self, loader):
+        if self._use_onnx():
+            model = self._load_local_onnx(loader)
+            if model is not None:
+                return model
+        model_kwargs = self._torch_model_kwargs()
         try:
+            if model_kwargs:
+                return loader(
+                    str(self._model_path),
+                    model_kwargs=model_kwargs,
+                    local_files_only=True,
+                )
             return loader(
                 str(self._model_path),
                 local_files_only=True,
@@ -120,5 +175,85 @@ class EmbeddingProvider:
             model.save(str(self._model_path))
         except Exception as exc:  # pragma: no cover - cache failure
             logger.warning("Failed to cache embedding model: %s", exc)
+            return self._apply_torch_dtype(model)
+
+        if self._settings.backend == "onnx":
+            self._export_quantized_onnx(loader)
+        # キャッシュには fp32 のまま保存し、このセッションで使うモデルだけ精度を落とす
+        return self._apply_torch_dtype(model)
+
+    def _resolve_torch_dtype(self):
+        name = (self._settings.dtype or "").strip().lower()
+        if name in ("", "fp32", "float32"):
+            return None
+        try:
+            import torch
+        except Exception:
+            return None
+        if name == "auto":
+            checker = getattr(torch.cpu, "_is_avx512_bf16_supported", None)
+            try:
+                supported = bool(checker()) if checker else False
+            except Exception:
+                supported = False
+            return torch.bfloat16 if supported else None
+        return {
+            "bf16": torch.bfloat16,
+            "bfloat16": torch.bfloat16,
+            "fp16": torch.float16,
+            "float16": torch.float16,
+        }.get(name)
+
+    def _torch_model_kwargs(self) -> dict | None:
+        dtype = self._resolve_torch_dtype()
+        if dtype is None:
+            return None
+        return {"torch_dtype": dtype}
 
-        return model
+    def _apply_torch_dtype(self, model):
+        dtype = self._resolve_torch_dtype()
+        if dtype is None:
+            return model
+        try:
+            return model.to(dtype)
+        except Exception as exc:  # pragma: no cover - keep fp32 model
+            logger.warning("Failed to convert embedding model to %s: %s", dtype, exc)
+            return model
+
+    def _use_onnx(self) -> bool:
+        if self._settings.backend != "onnx":
+            return False
+        # 量子化済み ONNX が無い場合は torch バックエンドで読み込む
+        return (self._model_path / self._settings.onnx_file_name).exists()
+
+    def _load_local_onnx(self, loader):
+        try:
+            return loader(
+                str(self._model_path),
+                backend="onnx",
+                model_kwargs={
+                    "file_name": self._settings.onnx_file_name,
+                    "provider": "CPUExecutionProvider",
+                },
+                local_files_only=True,
+            )
+        except TypeError:
+            # Older sentence-transformers releases do not accept backend/model_kwargs.
+            return None
+        except Exception as exc:
+            logger.warning("Failed to load ONNX embedding model, falling back to torch: %s", exc)
+            return None
+
+    def _export_quantized_onnx(self, loader) -> None:
+        # 次回以降の起動で int8 量子化 ONNX を読み込めるようキャッシュへ書き出す
+        try:
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            onnx_model = loader(str(self._model_path), backend="onnx")
+            export_dynamic_quantized_onnx_model(
+                onnx_model,
+                self._settings.onnx_quantization,
+                str(self._model_path),
+            )
+        except Exception as exc:  # pragma: no cover - optional export
+            logger.warning("Failed to export quantized ONNX embedding model: %s", exc)
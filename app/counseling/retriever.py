@@ -1,14 +1,32 @@
 ﻿from __future__ import annotations
 
+import json
 import logging
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 
 from .embedding import EmbeddingProvider
 
+# numpy は起動時間を抑えるため、最初に使うときに _load_numpy() で読み込む
+np = None
+
 logger = logging.getLogger(__name__)
 
 
+def _load_numpy() -> bool:
+    global np
+    if np is not None:
+        return True
+    try:
+        import numpy  # type: ignore
+    except ImportError:  # pragma: no cover - optional runtime dependency
+        return False
+    np = numpy
+    return True
+
+
 class TopicRetrievalError(RuntimeError):
     """Raised when topic retrieval cannot be completed."""
 
@@ -20,72 +38,233 @@ class TopicMatch:
 
 
 class TopicRetriever:
-    """Wrapper around ChromaDB topic retrieval."""
+    """Nearest-topic search over the bundled counseling topic vectors.
+
+    The vectors are read once from the ChromaDB collection, normalized, and loaded into an
+    in-memory USearch HNSW index (inner-product metric) that is cached next to the DB.
+    ChromaDB is queried directly when usearch is not installed. Query vectors are expected
+    to be unit length, so distances are ``1 - dot`` in both cases.
+    """
 
     def __init__(
         self,
         db_path: Path,
         embedder: EmbeddingProvider,
         collection_name: str = "counseling_topic",
+        encode_cache_size: int = 128,
+        ef_search: int | None = None,
+        index_path: Path | None = None,
     ) -> None:
         self._db_path = db_path
         self._embedder = embedder
         self._collection_name = collection_name
+        self._ef_search = ef_search
+        self._index_path = index_path or db_path.parent / "usearch" / f"{collection_name}.usearch"
         self._client: object | None = None
         self._collection: object | None = None
+        self._index: object | None = None
+        self._index_topics: list[str] = []
         self._init_error: str | None = None
+        self._id_to_topic: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._encode_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._encode_cache_size = max(0, encode_cache_size)
 
     def query(self, text: str, top_k: int, distance_threshold: float) -> list[TopicMatch]:
         if not text:
             return []
 
-        collection = self._ensure_collection()
-        vectors = self._embedder.encode([text])
+        self._ensure_backend()
+        vector = self._encode(text)
+        return self._search(vector.reshape(1, -1), top_k, distance_threshold)[0]
+
+    def query_batch(
+        self, texts: list[str], top_k: int, distance_threshold: float
+    ) -> list[list[TopicMatch]]:
+        """Encode and search several texts with one forward pass and one index query."""
+
+        targets = [text for text in texts if text]
+        if not targets:
+            return [[] for _ in texts]
+
+        self._ensure_backend()
+        vectors = self._encode_many(targets)
+        parsed = iter(self._search(vectors, top_k, distance_threshold))
+        return [next(parsed) if text else [] for text in texts]
+
+    def prewarm(self) -> None:
         try:
-            raw = collection.query(
+            self._ensure_backend()
+        except TopicRetrievalError as exc:  # pragma: no cover - surfaced again on first real use
+            logger.debug("Topic collection prewarm failed: %s", exc)
+
+    def _search(self, vectors, top_k: int, distance_threshold: float) -> list[list[TopicMatch]]:
+        # 同一トピックの重複を除いても top_k 件残るよう少しだけ余分に取得する
+        count = top_k * 3
+        if self._index is not None:
+            if np is not None and not hasattr(vectors, "shape"):
+                vectors = np.stack(vectors)
+            try:
+                found = self._index.search(vectors, count)
+            except Exception as exc:
+                raise TopicRetrievalError(str(exc)) from exc
+            rows = [found] if len(vectors) == 1 else [found[i] for i in range(len(vectors))]
+            return [
+                _collect_matches(
+                    [self._index_topics[int(key)] for key in row.keys],
+                    row.distances.tolist(),
+                    top_k,
+                    distance_threshold,
+                )
+                for row in rows
+            ]
+
+        raw = self._query_collection(self._collection, vectors, count)
+        ids = raw.get("ids") or []
+        distances = raw.get("distances") or []
+        results: list[list[TopicMatch]] = []
+        for index in range(len(vectors)):
+            row_ids = (ids[index] if index < len(ids) else None) or []
+            row_distances = (distances[index] if index < len(distances) else None) or []
+            topics = [self._id_to_topic.get(row_id, "") for row_id in row_ids]
+            results.append(_collect_matches(topics, row_distances, top_k, distance_threshold))
+        return results
+
+    @staticmethod
+    def _query_collection(collection, vectors, n_results: int) -> dict:
+        try:
+            return collection.query(
                 query_embeddings=vectors,
-                n_results=max(top_k, 20),
-                include=["distances", "metadatas"],
+                n_results=n_results,
+                include=["distances"],
             )
         except Exception as exc:
             raise TopicRetrievalError(str(exc)) from exc
 
-        distances = raw.get("distances") or []
-        metadatas = raw.get("metadatas") or []
-        if not distances or not metadatas:
-            return []
+    def _encode(self, text: str) -> np.ndarray:
+        vector = self._encode_cache.get(text)
+        if vector is not None:
+            self._encode_cache.move_to_end(text)
+            return vector
+        vector = self._embedder.encode_one(text)
+        self._remember(text, vector)
+        return vector
+
+    def _encode_many(self, texts: list[str]) -> list[np.ndarray]:
+        missing = [text for text in dict.fromkeys(texts) if text not in self._encode_cache]
+        encoded = dict(zip(missing, self._embedder.encode_batch(missing))) if missing else {}
+        vectors: list[np.ndarray] = []
+        for text in texts:
+            vector = encoded.get(text)
+            if vector is None:
+                vector = self._encode_cache[text]
+                self._encode_cache.move_to_end(text)
+            vectors.append(vector)
+        for text, vector in encoded.items():
+            self._remember(text, vector)
+        return vectors
+
+    def _remember(self, text: str, vector: np.ndarray) -> None:
+        if not self._encode_cache_size:
+            return
+        # 同一発話の再送時に埋め込み計算を省略するための LRU キャッシュ
+        self._encode_cache[text] = vector
+        if len(self._encode_cache) > self._encode_cache_size:
+            self._encode_cache.popitem(last=False)
 
-        distances = distances[0] or []
-        metadatas = metadatas[0] or []
+    def _ensure_backend(self) -> None:
+        if self._index is not None or self._collection is not None:
+            return
+        # 起動時の先読みスレッドと推論スレッドが同時に初期化しないよう排他する
+        with self._lock:
+            if self._index is not None or self._collection is not None:
+                return
+            if self._init_error:
+                raise TopicRetrievalError(self._init_error)
+            if self._load_index():
+                return
+            self._load_collection()
+
+    def _load_index(self) -> bool:
+        try:
+            from usearch.index import Index, MetricKind
+        except Exception:
+            return False
+        if not _load_numpy():
+            return False
 
-        results: list[TopicMatch] = []
-        seen: set[str] = set()
-        for meta, dist in zip(metadatas, distances):
-            if dist is None:
-                continue
+        topics_path = self._index_path.with_suffix(".topics.json")
+        if self._index_is_fresh(topics_path):
             try:
-                dist_value = float(dist)
-            except (TypeError, ValueError):
-                continue
-            if dist_value > distance_threshold:
-                continue
-            topic = ""
-            if isinstance(meta, dict):
-                topic = meta.get("topic_main", "")
-            if not topic or topic in seen:
-                continue
-            seen.add(topic)
-            results.append(TopicMatch(topic=topic, distance=dist_value))
-            if len(results) >= top_k:
-                break
+                index = Index.restore(str(self._index_path))
+                topics = json.loads(topics_path.read_text(encoding="utf-8"))
+            except Exception as exc:
+                logger.warning("Failed to load cached topic index, rebuilding: %s", exc)
+            else:
+                if (
+                    index is not None
+                    and index.metric == MetricKind.IP
+                    and isinstance(topics, list)
+                    and len(index) == len(topics)
+                ):
+                    self._activate_index(index, topics)
+                    return True
 
-        return results
+        collection = self._open_collection()
+        try:
+            rows = collection.get(include=["embeddings", "metadatas"])
+        except Exception as exc:
+            self._init_error = str(exc)
+            raise TopicRetrievalError(self._init_error) from exc
+        embeddings = rows.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            error = f"Topic collection is empty: {self._collection_name}"
+            self._init_error = error
+            raise TopicRetrievalError(error)
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        # 単位ベクトルにしておけば内積距離 (1 - dot) がコサイン距離と一致し、探索時のノルム計算が不要になる
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        topics = [
+            meta.get("topic_main", "") if isinstance(meta, dict) else ""
+            for meta in rows.get("metadatas") or [None] * len(vectors)
+        ]
+        # f16 で保持してメモリを半減させる（距離の精度への影響は軽微）
+        index = Index(
+            ndim=vectors.shape[1],
+            metric="ip",
+            dtype="f16",
+            connectivity=16,
+            expansion_add=64,
+            expansion_search=self._ef_search or 40,
+        )
+        index.add(np.arange(len(vectors), dtype=np.uint64), vectors)
+        try:
+            self._index_path.parent.mkdir(parents=True, exist_ok=True)
+            index.save(str(self._index_path))
+            topics_path.write_text(json.dumps(topics, ensure_ascii=False), encoding="utf-8")
+        except Exception as exc:  # pragma: no cover - cache failure
+            logger.warning("Failed to cache topic index: %s", exc)
+        self._activate_index(index, topics)
+        # 以降は USearch だけで検索するため Chroma のクライアントは保持しない
+        self._client = None
+        return True
+
+    def _index_is_fresh(self, topics_path: Path) -> bool:
+        if not self._index_path.exists() or not topics_path.exists():
+            return False
+        sqlite_path = self._db_path / "chroma.sqlite3"
+        if not sqlite_path.exists():
+            return True
+        return self._index_path.stat().st_mtime >= sqlite_path.stat().st_mtime
+
+    def _activate_index(self, index, topics: list[str]) -> None:
+        index.expansion_search = self._ef_search or 40
+        self._index_topics = topics
+        self._index = index
 
-    def _ensure_collection(self):
-        if self._collection is not None:
-            return self._collection
-        if self._init_error:
-            raise TopicRetrievalError(self._init_error)
+    def _open_collection(self):
         if not self._db_path.exists():
             error = f"Chroma DB not found: {self._db_path}"
             self._init_error = error
@@ -103,9 +282,62 @@ class TopicRetriever:
                 path=str(self._db_path),
                 settings=Settings(allow_reset=False),
             )
-            self._collection = self._client.get_collection(self._collection_name)
+            return self._client.get_collection(self._collection_name)
         except Exception as exc:
             self._init_error = str(exc)
             raise TopicRetrievalError(self._init_error) from exc
 
-        return self._collection
+    def _load_collection(self) -> None:
+        collection = self._open_collection()
+        try:
+            # トピックは固定の小さな集合なので、id→トピックの対応表を一度だけ読み込んでおく
+            rows = collection.get(include=["metadatas"])
+        except Exception as exc:
+            self._init_error = str(exc)
+            raise TopicRetrievalError(self._init_error) from exc
+        self._id_to_topic = {
+            row_id: meta.get("topic_main", "")
+            for row_id, meta in zip(rows.get("ids") or [], rows.get("metadatas") or [])
+            if isinstance(meta, dict)
+        }
+        self._apply_search_ef(collection)
+        self._collection = collection
+
+    def _apply_search_ef(self, collection) -> None:
+        if not self._ef_search:
+            return
+        try:
+            current = (collection.configuration or {}).get("hnsw") or {}
+            if current.get("ef_search") == self._ef_search:
+                return
+            # 設定は DB に永続化されるため、次回以降の起動では書き込みが発生しない
+            collection.modify(configuration={"hnsw": {"ef_search": self._ef_search}})
+        except Exception as exc:  # pragma: no cover - older chromadb releases
+            logger.debug("Failed to update HNSW ef_search: %s", exc)
+
+
+def _collect_matches(
+    topics: list[str],
+    distances: list,
+    top_k: int,
+    distance_threshold: float,
+) -> list[TopicMatch]:
+    results: list[TopicMatch] = []
+    seen: set[str] = set()
+    for topic, dist in zip(topics, distances):
+        if dist is None:
+            continue
+        try:
+            dist_value = float(dist)
+        except (TypeError, ValueError):
+            continue
+        if dist_value > distance_threshold:
+            continue
+        if not topic or topic in seen:
+            continue
+        seen.add(topic)
+        results.append(TopicMatch(topic=topic, distance=dist_value))
+        if len(results) >= top_k:
+            break
+
+    return results
@@ -1,7 +1,9 @@
 ﻿from __future__ import annotations
 
 import logging
+import threading
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Iterable
 
 from ..config import AppConfig
@@ -11,9 +13,28 @@ from .embedding import EmbeddingProvider, EmbeddingModelError
 from .prompt_catalog import SYSTEM_PROMPT_EXAMPLES
 from .retriever import TopicMatch, TopicRetriever, TopicRetrievalError
 
+# numpy は起動時間を抑えるため、最初に使うときに _load_numpy() で読み込む
+np = None
+
 logger = logging.getLogger(__name__)
 
 
+def _load_numpy() -> bool:
+    global np
+    if np is not None:
+        return True
+    try:
+        import numpy  # type: ignore
+    except ImportError:  # pragma: no cover - optional runtime dependency
+        return False
+    np = numpy
+    return True
+
+
+# プロンプトが空でないトピックだけを有効とみなす
+_VALID_TOPICS = frozenset(topic for topic, prompt in SYSTEM_PROMPT_EXAMPLES.items() if prompt)
+
+
 @dataclass(frozen=True)
 class TopicRoutingConfig:
     min_user_turns: int = 2
@@ -22,6 +43,8 @@ class TopicRoutingConfig:
     margin_threshold: float = 0.4
     top_k: int = 3
     collection_name: str = "counseling_topic"
+    # HNSW 探索時の候補数。小さいほど高速だが再現率が下がる
+    ef_search: int = 40
 
 
 @dataclass(frozen=True)
@@ -52,6 +75,8 @@ class CounselingTopicRouter:
         self._routing_config = routing_config or TopicRoutingConfig()
         self._embedder = EmbeddingProvider(config)
         self._retriever: TopicRetriever | None = None
+        # 起動時の先読みスレッドと推論スレッドが同時に TopicRetriever を作らないよう排他する
+        self._retriever_lock = threading.Lock()
         self._init_error: str | None = None
 
     def build_prompt(
@@ -61,21 +86,34 @@ class CounselingTopicRouter:
         state: TopicState,
     ) -> TopicPromptResult:
         if state.selected_topic:
-            topic_prompt = SYSTEM_PROMPT_EXAMPLES.get(state.selected_topic, "")
-            if topic_prompt:
+            if state.selected_topic in _VALID_TOPICS:
+                topic_prompt = SYSTEM_PROMPT_EXAMPLES[state.selected_topic]
                 return TopicPromptResult(self._combine_prompts(base_prompt, topic_prompt), None)
             return TopicPromptResult(base_prompt, None)
 
-        last_user = _last_user_message(messages)
+        if not isinstance(messages, list):
+            messages = list(messages)
+        pending = _pending_user_messages(messages, state.turns)
+        last_user = pending[-1] if len(pending) > 1 else _last_user_message(messages)
         if not last_user:
             return TopicPromptResult(base_prompt, None)
 
         try:
-            matches = self._ensure_retriever().query(
-                last_user,
-                top_k=self._routing_config.top_k,
-                distance_threshold=self._routing_config.distance_threshold,
-            )
+            retriever = self._ensure_retriever()
+            if len(pending) > 1:
+                # 復元した履歴などで未処理の発話が複数ある場合はまとめて推定する
+                batches = retriever.query_batch(
+                    pending,
+                    top_k=self._routing_config.top_k,
+                    distance_threshold=self._routing_config.distance_threshold,
+                )
+                matches = [match for batch in batches for match in batch]
+            else:
+                matches = retriever.query(
+                    last_user,
+                    top_k=self._routing_config.top_k,
+                    distance_threshold=self._routing_config.distance_threshold,
+                )
         except (EmbeddingModelError, TopicRetrievalError) as exc:
             if not self._init_error:
                 self._init_error = str(exc)
@@ -87,7 +125,7 @@ class CounselingTopicRouter:
             matches,
             self._routing_config.distance_threshold,
         )
-        next_turns = state.turns + 1
+        next_turns = state.turns + max(1, len(pending))
 
         selected_topic = None
         if next_turns >= self._routing_config.min_user_turns:
@@ -96,33 +134,46 @@ class CounselingTopicRouter:
                 self._routing_config.score_threshold,
                 self._routing_config.margin_threshold,
             )
-            if selected_topic and not SYSTEM_PROMPT_EXAMPLES.get(selected_topic):
+            if selected_topic not in _VALID_TOPICS:
                 selected_topic = None
 
         prompt = base_prompt
         if selected_topic:
-            topic_prompt = SYSTEM_PROMPT_EXAMPLES.get(selected_topic, "")
-            prompt = self._combine_prompts(base_prompt, topic_prompt)
+            prompt = self._combine_prompts(base_prompt, SYSTEM_PROMPT_EXAMPLES[selected_topic])
 
         changed = updated_scores != state.scores or next_turns != state.turns or selected_topic is not None
         update = TopicUpdate(updated_scores, selected_topic, next_turns) if changed else None
         return TopicPromptResult(prompt, update)
 
+    def prewarm(self) -> None:
+        """Load the embedding model ahead of the first Mind-Chat turn."""
+
+        self._embedder.prewarm()
+        try:
+            self._ensure_retriever().prewarm()
+        except TopicRetrievalError:
+            pass
+
     def _ensure_retriever(self) -> TopicRetriever:
         if self._retriever is not None:
             return self._retriever
-        if self._init_error:
-            raise TopicRetrievalError(self._init_error)
-
-        db_path = resource_path("app", "counseling", "db", "chroma")
-        self._retriever = TopicRetriever(
-            db_path=db_path,
-            embedder=self._embedder,
-            collection_name=self._routing_config.collection_name,
-        )
-        return self._retriever
+        with self._retriever_lock:
+            if self._retriever is not None:
+                return self._retriever
+            if self._init_error:
+                raise TopicRetrievalError(self._init_error)
+
+            db_path = resource_path("app", "counseling", "db", "chroma")
+            self._retriever = TopicRetriever(
+                db_path=db_path,
+                embedder=self._embedder,
+                collection_name=self._routing_config.collection_name,
+                ef_search=self._routing_config.ef_search,
+            )
+            return self._retriever
 
     @staticmethod
+    @lru_cache(maxsize=64)
     def _combine_prompts(base_prompt: str | None, topic_prompt: str) -> str:
         if base_prompt and topic_prompt:
             return f"{base_prompt}\n\n{topic_prompt}"
@@ -130,28 +181,49 @@ class CounselingTopicRouter:
 
 
 def _last_user_message(messages: Iterable[ChatMessage]) -> str | None:
-    for message in reversed(list(messages)):
+    # list/tuple はそのまま末尾から走査し、履歴全体のコピーを避ける
+    seq = messages if isinstance(messages, (list, tuple)) else list(messages)
+    for index in range(len(seq) - 1, -1, -1):
+        message = seq[index]
         if message.role == "user":
             content = message.content.strip()
             return content or None
     return None
 
 
+def _pending_user_messages(messages: list[ChatMessage], processed_turns: int) -> list[str]:
+    contents = [
+        message.content.strip()
+        for message in messages
+        if message.role == "user" and message.content.strip()
+    ]
+    return contents[max(0, processed_turns):]
+
+
 def _accumulate_scores(
     current_scores: dict[str, float],
     matches: list[TopicMatch],
     distance_threshold: float,
 ) -> dict[str, float]:
     updated = dict(current_scores)
-    for match in matches:
-        increment = _distance_to_score(match.distance, distance_threshold)
+    if not matches or distance_threshold <= 0:
+        return updated
+    for match, increment in zip(matches, _distances_to_scores(matches, distance_threshold)):
         if increment <= 0:
             continue
         updated[match.topic] = updated.get(match.topic, 0.0) + increment
     return updated
 
 
+def _distances_to_scores(matches: list[TopicMatch], threshold: float) -> list[float]:
+    if not _load_numpy():
+        return [_distance_to_score(match.distance, threshold) for match in matches]
+    distances = np.fromiter((match.distance for match in matches), dtype=np.float64, count=len(matches))
+    return np.maximum(0.0, (threshold - distances) / threshold).tolist()
+
+
 def _distance_to_score(distance: float, threshold: float) -> float:
+    # distance は単位ベクトル同士の 1 - dot（= コサイン距離）なので 0〜2 の範囲に収まる
     if threshold <= 0:
         return 0.0
     return max(0.0, (threshold - distance) / threshold)
@@ -160,11 +232,25 @@ def _distance_to_score(distance: float, threshold: float) -> float:
 def _select_topic(scores: dict[str, float], score_threshold: float, margin_threshold: float) -> str | None:
     if not scores:
         return None
-    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
-    top_topic, top_score = ranked[0]
-    second_score = ranked[1][1] if len(ranked) > 1 else 0.0
+    top_topic, top_score, second_score = _top_two(scores)
     if top_score < score_threshold:
         return None
     if top_score - second_score < margin_threshold:
         return None
     return top_topic
+
+
+def _top_two(scores: dict[str, float]) -> tuple[str, float, float]:
+    if len(scores) <= 4 or not _load_numpy():
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        top_topic, top_score = ranked[0]
+        second_score = ranked[1][1] if len(ranked) > 1 else 0.0
+        return top_topic, top_score, second_score
+
+    topics = list(scores)
+    values = np.fromiter(scores.values(), dtype=np.float64, count=len(topics))
+    # 全体をソートせず上位 2 件だけを取り出す（同点時は挿入順の早い方を優先）
+    first, second = (int(index) for index in np.argpartition(values, -2)[-2:])
+    if values[second] > values[first] or (values[second] == values[first] and second < first):
+        first, second = second, first
+    return topics[first], float(values[first]), float(values[second])
@@ -5,8 +5,13 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Optional
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional runtime dependency
+    orjson = None
+
 from .config import AppConfig
-from .models import ChatMessage, Conversation
+from .models import ChatMessage, Conversation, utc_now_iso
 
 
 class HistoryError(Exception):
@@ -76,7 +81,7 @@ class HistoryManager:
         if conversation.messages and conversation.messages[-1].role == "user":
             # LLM 応答に失敗した場合は最後のユーザ発話を巻き戻す
             conversation.messages.pop()
-            conversation.updated_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+            conversation.updated_at = utc_now_iso()
             self._persist()
         return conversation
 
@@ -88,7 +93,7 @@ class HistoryManager:
                 f"お気に入りは最大{self._config.max_favorites}件までです。"
             )
         conversation.is_favorite = target_state
-        conversation.updated_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+        conversation.updated_at = utc_now_iso()
         self._promote_to_top(conversation)
         self._enforce_limits()
         self._persist()
@@ -127,7 +132,10 @@ class HistoryManager:
             return
 
         try:
-            payload = json.loads(self._path.read_text(encoding="utf-8"))
+            if orjson is not None:
+                payload = orjson.loads(self._path.read_bytes())
+            else:
+                payload = json.loads(self._path.read_text(encoding="utf-8"))
         except json.JSONDecodeError:
             # ファイル破損時は安全に空の状態で立ち上げる
             payload = []
@@ -137,6 +145,10 @@ class HistoryManager:
         self._conversations = conversations
 
     def _persist(self) -> None:
+        if orjson is not None:
+            # Conversation / ChatMessage の dataclass を to_dict を経由せず直接書き出す
+            self._path.write_bytes(orjson.dumps(self._conversations, option=orjson.OPT_INDENT_2))
+            return
         payload = [conversation.to_dict() for conversation in self._conversations]
         self._path.write_text(
             json.dumps(payload, ensure_ascii=False, indent=2),
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import os
+import re
 import threading
 from pathlib import Path
-from typing import Iterable, List
+from typing import Callable, Iterable, List
 
 from .config import AppConfig
 from .models import ChatMessage
@@ -13,6 +14,10 @@ try:
 except ImportError:  # pragma: no cover - handled at runtime
     Llama = None
 
+# 読み上げを文単位で先行させるため、最後の区切り（句点・感嘆符・疑問符・改行）までを取り出す
+_COMPLETE_SENTENCES = re.compile(r".*[。！？!?\n]", re.DOTALL)
+_CODE_FENCE = "```"
+
 
 class LocalLLM:
     """
@@ -32,7 +37,16 @@ class LocalLLM:
         # llama.cpp の推論はスレッド非安全なため排他制御を入れておく
         self._lock = threading.Lock()
 
-    def generate_reply(self, history: Iterable[ChatMessage], system_prompt: str | None) -> str:
+    def generate_reply(
+        self,
+        history: Iterable[ChatMessage],
+        system_prompt: str | None,
+        on_sentence: Callable[[str], None] | None = None,
+    ) -> str:
+        """
+        on_sentence を渡した場合はトークンをストリーミングで受け取り、
+        文が確定するたびに呼び出す（音声合成を応答全体の完了前に始めるため）。
+        """
         llama = self._ensure_model()
         chat_messages = self._build_prompt(history, system_prompt)
         with self._lock:
@@ -41,8 +55,12 @@ class LocalLLM:
                 max_tokens=self._config.max_response_tokens,
                 temperature=self._config.temperature,
                 top_p=self._config.top_p,
+                stream=on_sentence is not None,
             )
-        content = completion["choices"][0]["message"]["content"]
+            if on_sentence is None:
+                content = completion["choices"][0]["message"]["content"]
+            else:
+                content = _stream_sentences(completion, on_sentence)
         return content.strip()
 
     # Internal helpers ---------------------------------------------------
@@ -133,3 +151,26 @@ class LocalLLM:
             else:
                 normalized.append(clone)
         return normalized
+
+
+def _stream_sentences(chunks: Iterable[dict], on_sentence: Callable[[str], None]) -> str:
+    parts: List[str] = []
+    pending = ""
+    for chunk in chunks:
+        delta = chunk["choices"][0]["delta"].get("content")
+        if not delta:
+            continue
+        parts.append(delta)
+        pending += delta
+        if pending.count(_CODE_FENCE) % 2:
+            # コードブロックの途中では区切らず、閉じるまで溜めておく
+            continue
+        match = _COMPLETE_SENTENCES.match(pending)
+        if match is None:
+            continue
+        sentences, pending = match.group(), pending[match.end():]
+        if sentences.strip():
+            on_sentence(sentences)
+    if pending.strip():
+        on_sentence(pending)
+    return "".join(parts)
@@ -1,20 +1,29 @@
 from __future__ import annotations
 
+import json
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Iterable, Literal
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional runtime dependency
+    orjson = None
+
+
+_UTC = timezone.utc
+
 
 def utc_now_iso() -> str:
     # タイムゾーン付き ISO 文字列（秒精度）で現在時刻を取得するユーティリティ
-    return datetime.now(tz=timezone.utc).replace(microsecond=0).isoformat()
+    return datetime.now(tz=_UTC).isoformat(timespec="seconds")
 
 
 ChatRole = Literal["system", "user", "assistant"]
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatMessage:
     role: ChatRole
     content: str
@@ -36,7 +45,7 @@ class ChatMessage:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Conversation:
     conversation_id: str = field(default_factory=lambda: uuid.uuid4().hex)
     title: str = "新しい相談"
@@ -72,6 +81,12 @@ class Conversation:
             "topic_turns": self.topic_turns,
         }
 
+    def to_json_bytes(self) -> bytes:
+        if orjson is not None:
+            # orjson は dataclass を直接シリアライズできるため中間 dict を作らない
+            return orjson.dumps(self)
+        return json.dumps(self.to_dict(), ensure_ascii=False).encode("utf-8")
+
     @classmethod
     def from_dict(cls, payload: dict) -> "Conversation":
         messages = [ChatMessage.from_dict(m) for m in payload.get("messages", [])]
@@ -16,8 +16,13 @@ def _package_root() -> Path:
     return Path(__file__).resolve().parent.parent
 
 
+@lru_cache(maxsize=64)
 def resource_path(*relative_parts: str) -> Path:
-    """Resolve a resource path that works for PyInstaller bundles as well."""
+    """Resolve a resource path that works for PyInstaller bundles as well.
+
+    Results are memoized per argument tuple; call ``resource_path.cache_clear()``
+    to reset them (e.g. after changing ``sys._MEIPASS`` in tests).
+    """
 
     if not relative_parts:
         return _package_root()
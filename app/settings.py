@@ -1,13 +1,26 @@
 from __future__ import annotations
 
 import json
-from copy import deepcopy
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any, Mapping
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional runtime dependency
+    orjson = None
+
 SETTINGS_FILENAME = "mindchat_settings.json"
 
-DEFAULT_SETTINGS: dict[str, Any] = {
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+# 既定値は読み取り専用にして共有し、load_settings のたびに deepcopy しない
+DEFAULT_SETTINGS: Mapping[str, Any] = _freeze({
     "app": {
         "default_mode_key": "plain_chat",
     },
@@ -26,6 +39,7 @@ DEFAULT_SETTINGS: dict[str, Any] = {
     },
     "speech": {
         "model_path": None,
+        "preload": True,
         "preprocess": {
             "enabled": True,
             "force_mono": True,
@@ -46,7 +60,7 @@ DEFAULT_SETTINGS: dict[str, Any] = {
     "voicevox": {
         "base_url": "http://127.0.0.1:50021",
     },
-}
+})
 
 
 def settings_path(root: Path) -> Path:
@@ -56,15 +70,15 @@ def settings_path(root: Path) -> Path:
 def load_settings(root: Path) -> dict[str, Any]:
     path = settings_path(root)
     if not path.exists():
-        return deepcopy(DEFAULT_SETTINGS)
+        return dict(DEFAULT_SETTINGS)
 
     try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
+        payload = _loads_json(path)
     except json.JSONDecodeError:
-        return deepcopy(DEFAULT_SETTINGS)
+        return dict(DEFAULT_SETTINGS)
 
     if not isinstance(payload, Mapping):
-        return deepcopy(DEFAULT_SETTINGS)
+        return dict(DEFAULT_SETTINGS)
     return _deep_merge(DEFAULT_SETTINGS, payload)
 
 
@@ -119,11 +133,25 @@ def resolve_path_setting(settings: Mapping[str, Any], dotted_key: str, root: Pat
     return path
 
 
+def _loads_json(path: Path) -> Any:
+    if orjson is not None:
+        # orjson.JSONDecodeError は json.JSONDecodeError のサブクラス
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
 def _deep_merge(base: Mapping[str, Any], override: Mapping[str, Any]) -> dict[str, Any]:
-    merged: dict[str, Any] = deepcopy(base)
-    for key, value in override.items():
-        if isinstance(value, Mapping) and isinstance(merged.get(key), Mapping):
-            merged[key] = _deep_merge(merged[key], value)
-        else:
-            merged[key] = value
+    merged: dict[str, Any] = dict(base)
+    stack: list[tuple[dict[str, Any], Mapping[str, Any]]] = [(merged, override)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            current = target.get(key)
+            if isinstance(value, Mapping) and isinstance(current, Mapping):
+                # 上書きされる枝だけをコピーし、それ以外は既定値をそのまま共有する
+                branch = dict(current)
+                target[key] = branch
+                stack.append((branch, value))
+            else:
+                target[key] = value
     return merged
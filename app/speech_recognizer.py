@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import importlib.util
 import json
 import math
 import os
+import re
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Tuple
 
@@ -15,12 +18,39 @@ try:
 except ImportError:  # pragma: no cover - optional runtime dependency
     vosk = None
 
-try:
-    import numpy as np  # type: ignore
-    from scipy.signal import resample_poly  # type: ignore
-except Exception:  # pragma: no cover - optional runtime dependency
-    np = None
-    resample_poly = None
+# 認識結果の整形に使う正規表現（呼び出しごとのパターン組み立てを避ける）
+_CJK = r"\u3005\u3040-\u30ff\u4e00-\u9fff"
+_RE_WS = re.compile(r"\s+")
+_RE_CJK_WS_CJK = re.compile(rf"(?<=[{_CJK}])\s+(?=[{_CJK}])")
+_RE_NUM_WS_CJK = re.compile(rf"(?<=[0-9])\s+(?=[{_CJK}])")
+_RE_CJK_WS_NUM = re.compile(rf"(?<=[{_CJK}])\s+(?=[0-9])")
+# 疑問文とみなす語尾（正規表現ではなく str.endswith で判定する）
+_QUESTION_TAILS = ("でしょうか", "ですか", "ますか", "かな", "か")
+
+# numpy/scipy は起動時間を抑えるため、最初の前処理時に _load_dsp() で読み込む
+np = None
+firwin = None
+resample_poly = None
+
+
+def _dsp_available() -> bool:
+    return (
+        importlib.util.find_spec("numpy") is not None
+        and importlib.util.find_spec("scipy") is not None
+    )
+
+
+def _load_dsp() -> bool:
+    global np, firwin, resample_poly
+    if np is not None and resample_poly is not None:
+        return True
+    try:
+        import numpy  # type: ignore
+        from scipy.signal import firwin as _firwin, resample_poly as _resample_poly  # type: ignore
+    except Exception:  # pragma: no cover - optional runtime dependency
+        return False
+    np, firwin, resample_poly = numpy, _firwin, _resample_poly
+    return True
 
 
 class SpeechRecognitionError(Exception):
@@ -46,6 +76,9 @@ class SpeechRecognizer:
             self._model_path = default_model_dir
         self._model: object | None = None
         self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        # (up, down) ごとのリサンプリング用 FIR フィルタ。毎回の設計コストを省く
+        self._resample_filters: dict[tuple[int, int], object] = {}
         self._preprocess_enabled = get_bool_setting(
             config.settings, "speech.preprocess.enabled", True
         )
@@ -71,6 +104,9 @@ class SpeechRecognizer:
             config.settings, "speech.postprocess.sentence_gap_sec", 0.6
         )
         self._sentence_gap_sec = max(0.0, sentence_gap)
+        if get_bool_setting(config.settings, "speech.preload", True) and self.availability_error() is None:
+            # 録音を始めるまでの間にモデルを読み込んでおき、初回認識の待ち時間を隠す
+            threading.Thread(target=self._preload_model, daemon=True).start()
 
     def availability_error(self) -> str | None:
         """
@@ -79,7 +115,7 @@ class SpeechRecognizer:
 
         if vosk is None:
             return "音声認識ライブラリ(vosk)が見つかりません。`pip install vosk` を実行してください。"
-        if self._preprocess_enabled and (np is None or resample_poly is None):
+        if self._preprocess_enabled and not _dsp_available():
             return "音声前処理ライブラリ(numpy/scipy)が見つかりません。`pip install -r requirements.txt` を実行してください。"
         if not self._model_path.exists():
             return f"音声認識モデルが見つかりません: {self._model_path}"
@@ -91,25 +127,112 @@ class SpeechRecognizer:
         sample_rate: int,
         channels: int = 1,
         sample_format: str = "int16",
+        already_target: bool = False,
     ) -> str:
         """
         Convert raw PCM audio into text using Vosk.
+
+        ``already_target`` marks audio that was captured as mono Int16 at the target rate,
+        in which case preprocessing is skipped.
         """
 
         if not pcm_bytes:
             raise SpeechRecognitionError("音声が検出できませんでした。録音を確認してください。")
 
         model = self._ensure_model()
-        pcm_bytes, target_rate = self._preprocess_pcm(
-            pcm_bytes, sample_rate, channels, sample_format
+        if (
+            already_target
+            and sample_rate == self._target_sample_rate
+            and channels == 1
+            and (sample_format or "").strip().lower() == "int16"
+        ):
+            target_rate = sample_rate
+        else:
+            pcm_bytes, target_rate = self._preprocess_pcm(
+                pcm_bytes, sample_rate, channels, sample_format
+            )
+        recognizer = self._new_kaldi_recognizer(model, target_rate)
+        recognizer.AcceptWaveform(pcm_bytes)
+        return self._final_text(recognizer)
+
+    def recognize_pcm_async(
+        self,
+        pcm_bytes: bytes,
+        sample_rate: int,
+        channels: int = 1,
+        sample_format: str = "int16",
+        already_target: bool = False,
+        stream: SpeechStream | None = None,
+    ) -> Future:
+        """
+        Run :meth:`recognize_pcm` on the recognizer's background thread and return its future.
+
+        When ``stream`` already received the same audio during recording, only its final
+        result is computed; otherwise the full PCM is recognized as usual.
+        """
+
+        if stream is not None:
+            return self._submit(
+                self._finish_stream,
+                stream,
+                pcm_bytes,
+                sample_rate,
+                channels,
+                sample_format,
+                already_target,
+            )
+        return self._submit(
+            self.recognize_pcm,
+            pcm_bytes,
+            sample_rate,
+            channels,
+            sample_format,
+            already_target,
         )
-        recognizer = vosk.KaldiRecognizer(model, target_rate)  # type: ignore[arg-type]
+
+    def open_stream(
+        self, sample_rate: int, channels: int = 1, sample_format: str = "int16"
+    ) -> SpeechStream | None:
+        """
+        Start incremental recognition for a recording that is still in progress.
+
+        Returns None when the audio would need preprocessing, since that cannot be applied
+        chunk by chunk.
+        """
+
+        if (
+            sample_rate != self._target_sample_rate
+            or channels != 1
+            or (sample_format or "").strip().lower() != "int16"
+            or self.availability_error() is not None
+        ):
+            return None
+        return SpeechStream(self, sample_rate)
+
+    def shutdown(self) -> None:
+        """Wait for a running recognition and stop the background thread."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    # Internal helpers ---------------------------------------------------
+    def _submit(self, fn, *args) -> Future:
+        if self._executor is None:
+            # Vosk (Kaldi) は認識中に GIL を解放するため、専用スレッドを使い回せば UI と並行して動ける
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vosk")
+        return self._executor.submit(fn, *args)
+
+    def _new_kaldi_recognizer(self, model, sample_rate: int):
+        recognizer = vosk.KaldiRecognizer(model, sample_rate)  # type: ignore[arg-type]
         if self._append_punctuation and self._use_timing:
             try:
                 recognizer.SetWords(True)
             except Exception:
                 pass
-        recognizer.AcceptWaveform(pcm_bytes)
+        return recognizer
+
+    def _final_text(self, recognizer) -> str:
         result = json.loads(recognizer.FinalResult())
         text = result.get("text", "").strip()
         if not text:
@@ -117,7 +240,27 @@ class SpeechRecognizer:
         words = result.get("result") if self._use_timing else None
         return self._postprocess_text(text, words)
 
-    # Internal helpers ---------------------------------------------------
+    def _finish_stream(
+        self,
+        stream: SpeechStream,
+        pcm_bytes: bytes,
+        sample_rate: int,
+        channels: int,
+        sample_format: str,
+        already_target: bool,
+    ) -> str:
+        recognizer = stream.take_recognizer(len(pcm_bytes))
+        if recognizer is None:
+            # 途中で失敗した、または録音データと一致しない場合は通常どおり一括で認識する
+            return self.recognize_pcm(pcm_bytes, sample_rate, channels, sample_format, already_target)
+        return self._final_text(recognizer)
+
+    def _preload_model(self) -> None:
+        try:
+            self._ensure_model()
+        except Exception:  # pragma: no cover - surfaced again on the first recognition
+            pass
+
     def _ensure_model(self):
         error = self.availability_error()
         if error:
@@ -139,7 +282,16 @@ class SpeechRecognizer:
     ) -> Tuple[bytes, int]:
         if not self._preprocess_enabled:
             return pcm_bytes, sample_rate
-        if np is None or resample_poly is None:
+        format_key = (sample_format or "").strip().lower()
+        if (
+            sample_rate > 0
+            and channels <= 1
+            and format_key == "int16"
+            and (not self._resample or sample_rate == self._target_sample_rate)
+        ):
+            # 既にモノラル int16 で目的のレートなら変換は不要（numpy/scipy も読み込まない）
+            return pcm_bytes, sample_rate
+        if not _load_dsp():
             raise SpeechRecognitionError(
                 "音声前処理に必要なライブラリが見つかりません。numpy/scipy をインストールしてください。"
             )
@@ -148,7 +300,6 @@ class SpeechRecognizer:
         if channels > 1 and not self._force_mono:
             return pcm_bytes, sample_rate
 
-        format_key = (sample_format or "").strip().lower()
         need_decode = (
             self._force_mono
             or self._resample
@@ -168,12 +319,29 @@ class SpeechRecognizer:
                 gcd = math.gcd(sample_rate, target_rate)
                 up = target_rate // gcd
                 down = sample_rate // gcd
-                audio = resample_poly(audio, up, down).astype(np.float32, copy=False)
+                audio = resample_poly(
+                    audio, up, down, window=self._resample_filter(up, down)
+                ).astype(np.float32, copy=False)
 
-        audio = np.clip(audio, -1.0, 1.0)
-        pcm16 = (audio * 32767.0).astype(np.int16).tobytes()
+        # 一時配列を作らずにスケーリングとクリップをその場で行い、最後に一度だけ int16 へ変換する
+        if not audio.flags.writeable:
+            audio = audio.copy()
+        np.multiply(audio, 32767.0, out=audio)
+        np.clip(audio, -32767.0, 32767.0, out=audio)
+        pcm16 = audio.astype(np.int16).tobytes()
         return pcm16, target_rate
 
+    def _resample_filter(self, up: int, down: int):
+        key = (up, down)
+        taps = self._resample_filters.get(key)
+        if taps is None:
+            # resample_poly の既定と同じ Kaiser 窓のローパス。up 倍のゲインは resample_poly 側で掛かる
+            max_rate = max(up, down)
+            taps = firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+            taps = taps.astype(np.float32)
+            self._resample_filters[key] = taps
+        return taps
+
     def _decode_pcm(self, pcm_bytes: bytes, channels: int, format_key: str):
         if channels <= 0:
             channels = 1
@@ -195,24 +363,26 @@ class SpeechRecognizer:
             frames = audio.size // channels
             if frames <= 0:
                 return np.array([], dtype=np.float32)
-            audio = audio[: frames * channels]
-            audio = audio.reshape(-1, channels).mean(axis=1)
+            # mean() の中間配列を避け、float32 のままチャネルを足し合わせる
+            view = audio[: frames * channels].reshape(frames, channels)
+            mono = view[:, 0].copy()
+            for channel in range(1, channels):
+                mono += view[:, channel]
+            mono *= 1.0 / channels
+            audio = mono
         return audio.astype(np.float32, copy=False)
 
     def _postprocess_text(self, text: str, words: list[dict] | None) -> str:
-        import re
-
         cleaned = text.strip()
         if self._append_punctuation and self._use_timing and words:
             timing_text = self._render_with_timing(words)
             if timing_text:
                 cleaned = timing_text
         if self._normalize_spaces:
-            cleaned = re.sub(r"\s+", " ", cleaned)
-            cjk = r"\u3005\u3040-\u30ff\u4e00-\u9fff"
-            cleaned = re.sub(rf"(?<=[{cjk}])\s+(?=[{cjk}])", "", cleaned)
-            cleaned = re.sub(rf"(?<=[0-9])\s+(?=[{cjk}])", "", cleaned)
-            cleaned = re.sub(rf"(?<=[{cjk}])\s+(?=[0-9])", "", cleaned)
+            cleaned = _RE_WS.sub(" ", cleaned)
+            cleaned = _RE_CJK_WS_CJK.sub("", cleaned)
+            cleaned = _RE_NUM_WS_CJK.sub("", cleaned)
+            cleaned = _RE_CJK_WS_NUM.sub("", cleaned)
             cleaned = cleaned.strip()
 
         if not cleaned:
@@ -221,7 +391,7 @@ class SpeechRecognizer:
             return cleaned
         if cleaned[-1] in "。！？?!":
             return cleaned
-        if re.search(r"(でしょうか|ですか|ますか|かな|か)$", cleaned):
+        if cleaned.endswith(_QUESTION_TAILS):
             return f"{cleaned}？"
         return f"{cleaned}。"
 
@@ -251,3 +421,54 @@ class SpeechRecognizer:
             if isinstance(end, (int, float)):
                 prev_end = float(end)
         return " ".join(tokens)
+
+
+class SpeechStream:
+    """
+    Feeds recorded PCM chunks to Vosk while recording is still running.
+
+    Chunks are queued on the recognizer's single background thread, so they are decoded in
+    order and the final result is ready shortly after recording stops.
+    """
+
+    def __init__(self, owner: SpeechRecognizer, sample_rate: int) -> None:
+        self._owner = owner
+        self._sample_rate = sample_rate
+        self._recognizer: object | None = None
+        self._error: Exception | None = None
+        self._accepted_bytes = 0
+        # 奇数バイトで届いた場合に次のチャンクへ持ち越す端数
+        self._remainder = b""
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk or self._error is not None:
+            return
+        if self._remainder:
+            chunk = self._remainder + chunk
+        usable = len(chunk) - (len(chunk) % 2)
+        self._remainder = chunk[usable:]
+        if usable:
+            self._owner._submit(self._accept, chunk[:usable] if self._remainder else chunk)
+
+    def take_recognizer(self, expected_bytes: int):
+        """Return the fed recognizer, or None if it did not receive exactly ``expected_bytes``."""
+
+        if self._error is not None or self._recognizer is None or self._remainder:
+            return None
+        if self._accepted_bytes != expected_bytes:
+            return None
+        recognizer, self._recognizer = self._recognizer, None
+        return recognizer
+
+    def _accept(self, chunk: bytes) -> None:
+        # 認識スレッド上で実行される
+        if self._error is not None:
+            return
+        try:
+            if self._recognizer is None:
+                model = self._owner._ensure_model()
+                self._recognizer = self._owner._new_kaldi_recognizer(model, self._sample_rate)
+            self._recognizer.AcceptWaveform(chunk)
+            self._accepted_bytes += len(chunk)
+        except Exception as exc:  # pragma: no cover - falls back to full recognition
+            self._error = exc
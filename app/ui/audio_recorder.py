@@ -1,12 +1,28 @@
 from __future__ import annotations
 
-import sys
 import time
-from array import array
 
-from PySide6.QtCore import QIODevice, QObject, QTimer, Signal
+from PySide6.QtCore import QByteArray, QIODevice, QObject, QTimer, Signal
 from PySide6.QtMultimedia import QAudioFormat, QAudioSource, QMediaDevices
 
+# numpy は起動時間を抑えるため、最初に録音を始めたときに _load_numpy() で読み込む
+np = None
+
+# 無音判定で一度に走査するサンプル数
+_VOICE_SCAN_SAMPLES = 1024
+
+
+def _load_numpy() -> bool:
+    global np
+    if np is not None:
+        return True
+    try:
+        import numpy  # type: ignore
+    except ImportError:  # pragma: no cover - optional runtime dependency
+        return False
+    np = numpy
+    return True
+
 
 class AudioRecorder(QObject):
     """
@@ -15,7 +31,10 @@ class AudioRecorder(QObject):
     Captures raw PCM audio into memory and emits the byte stream when stopped.
     """
 
-    audio_ready = Signal(object)  # emits tuple[bytes, int, int, str] = (pcm, rate, channels, format)
+    # emits tuple[bytes, int, int, str, bool] = (pcm, rate, channels, format, already_target)
+    audio_ready = Signal(object)
+    # 録音中に読み取った PCM チャンク（逐次認識用）
+    chunk_captured = Signal(bytes)
     recording_started = Signal()
     recording_stopped = Signal(str)
     error = Signal(str)
@@ -30,12 +49,13 @@ class AudioRecorder(QObject):
         super().__init__(parent)
         self._audio_source: QAudioSource | None = None
         self._io_device: QIODevice | None = None
-        self._buffer = bytearray()
+        # 読み取った QByteArray をコピーせずに保持し、停止時に一度だけ連結する
+        self._buffer: list[QByteArray] = []
         self._recording = False
         self._sample_rate = 16_000
         self._channels = 1
-        self._bytes_per_sample = 2
         self._sample_format = QAudioFormat.SampleFormat.Int16
+        self._already_target = True
         self._silence_threshold = silence_threshold
         self._silence_timeout_ms = silence_timeout_ms
         self._silence_detection_enabled = silence_timeout_ms > 0
@@ -55,6 +75,16 @@ class AudioRecorder(QObject):
     def is_recording(self) -> bool:
         return self._recording
 
+    @property
+    def is_target_format(self) -> bool:
+        """True when the current recording is captured as 16 kHz mono Int16."""
+
+        return self._already_target
+
+    @property
+    def sample_rate(self) -> int:
+        return self._sample_rate
+
     def start(self) -> bool:
         if self._recording:
             return False
@@ -70,7 +100,8 @@ class AudioRecorder(QObject):
         target_format.setSampleRate(16_000)
         target_format.setSampleFormat(QAudioFormat.SampleFormat.Int16)
 
-        self._silence_detection_enabled = self._silence_timeout_ms > 0
+        # 無音判定は 16bit リトルエンディアン PCM を NumPy で走査する前提
+        self._silence_detection_enabled = self._silence_timeout_ms > 0 and _load_numpy()
         if not device.isFormatSupported(target_format):
             # Fallback to the preferred format if 16kHz/Int16 is not available
             target_format = preferred
@@ -79,8 +110,12 @@ class AudioRecorder(QObject):
         self._sample_rate = target_format.sampleRate()
         self._channels = target_format.channelCount() or 1
         self._sample_format = target_format.sampleFormat()
-        frame_bytes = target_format.bytesForFrames(1)
-        self._bytes_per_sample = max(1, int(frame_bytes / max(1, self._channels)))
+        # 16kHz/mono/Int16 で録音できた場合は認識側の前処理を省略できる
+        self._already_target = (
+            self._sample_rate == 16_000
+            and self._channels == 1
+            and self._sample_format == QAudioFormat.SampleFormat.Int16
+        )
 
         self._buffer.clear()
         self._last_voice_time = time.monotonic()
@@ -117,7 +152,7 @@ class AudioRecorder(QObject):
             except (TypeError, RuntimeError):
                 pass
 
-        data = bytes(self._buffer)
+        data = b"".join(self._buffer)
         self._cleanup()
 
         reason = auto_reason or ""
@@ -126,7 +161,13 @@ class AudioRecorder(QObject):
             self.error.emit("録音データが空でした。マイクの接続を確認してください。")
             return
         self.audio_ready.emit(
-            (data, self._sample_rate, self._channels, self._format_label(self._sample_format))
+            (
+                data,
+                self._sample_rate,
+                self._channels,
+                self._format_label(self._sample_format),
+                self._already_target,
+            )
         )
 
     # Internal helpers ---------------------------------------------------
@@ -138,9 +179,11 @@ class AudioRecorder(QObject):
             chunk = self._io_device.readAll()
             if not chunk:
                 break
-            raw = bytes(chunk)
-            self._buffer.extend(raw)
-            self._update_voice_activity(raw)
+            # QByteArray はバッファプロトコルに対応しているため、保持も無音判定もコピーせずに行う
+            self._buffer.append(chunk)
+            self._update_voice_activity(chunk)
+            if self._already_target:
+                self.chunk_captured.emit(bytes(chunk))
 
     def _handle_max_duration(self) -> None:
         self.stop("最大録音時間に達したため自動停止しました。")
@@ -152,23 +195,17 @@ class AudioRecorder(QObject):
         if elapsed_ms >= self._silence_timeout_ms:
             self.stop("無音状態が続いたため自動停止しました。")
 
-    def _update_voice_activity(self, chunk: bytes) -> None:
+    def _update_voice_activity(self, chunk: QByteArray) -> None:
         if not self._silence_detection_enabled:
             return
-        if self._bytes_per_sample != 2:
-            # Silence detection only supports 16-bit PCM
-            self._last_voice_time = time.monotonic()
-            return
-
-        samples = array("h")
-        samples.frombytes(chunk)
-        if sys.byteorder != "little":
-            samples.byteswap()
-        if not samples:
-            return
+        # 無音判定は Int16 で録音できた場合だけ有効になる。発話中は最初の区間で打ち切れるよう小分けに見る
+        samples = np.frombuffer(chunk, dtype="<i2", count=len(chunk) // 2)
         threshold = self._silence_threshold
-        if any(abs(sample) > threshold for sample in samples):
-            self._last_voice_time = time.monotonic()
+        step = _VOICE_SCAN_SAMPLES
+        for start in range(0, samples.size, step):
+            if int(np.abs(samples[start:start + step], dtype=np.int32).max()) > threshold:
+                self._last_voice_time = time.monotonic()
+                return
 
     @staticmethod
     def _format_label(sample_format: QAudioFormat.SampleFormat) -> str:
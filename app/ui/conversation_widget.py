@@ -1,13 +1,10 @@
 from __future__ import annotations
 
 import html
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable
 
-# 外部ライブラリをインポート
-import markdown
-import re # <-- ここでreもインポートして利用
-
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QTextCursor, QFont
 from PySide6.QtWidgets import (
@@ -26,6 +23,58 @@ from PySide6.QtWidgets import (
 
 from ..models import ChatMessage, Conversation
 from .media_display import MediaDisplayWidget
+from .simple_markdown import render_markdown
+
+# メッセージ 1 件分の HTML 雛形（描画のたびに組み立てないよう定数化しておく）
+_MESSAGE_TEMPLATE = (
+    '<div style="margin-bottom: 10px;">'
+    '<p style="margin-bottom:0px;"><b style="color:{color}">{label}</b></p>'
+    '{content}</div>'
+)
+_USER_LABEL = "👤 あなた"
+# 末尾がリストのときに次のメッセージとの間隔が崩れないよう差し込むスペーサー
+_LIST_SPACER = '<div style="height:0; line-height:0; margin:0; padding:0;"></div>'
+
+# markdown は起動を遅くしないよう、簡易レンダラーで扱えない返信を最初に描画するときに読み込む
+_markdown_render = None
+
+
+def _render_markdown(text: str, extensions: list[str]) -> str:
+    global _markdown_render
+    if _markdown_render is None:
+        from markdown import markdown as _markdown_render
+    return _markdown_render(text, extensions=extensions)
+
+
+@lru_cache(maxsize=512)
+def _assistant_content_html(text: str) -> str:
+    # 履歴の再描画やラベル変更のたびに同じ返信を Markdown 変換し直さないようキャッシュする
+    content = render_markdown(text)
+    if content is not None:
+        return _with_list_spacer(content)
+
+    # 引用やリンクなど簡易レンダラーが対応しない記法は markdown ライブラリで変換する
+    content = _render_markdown(
+        text,
+        extensions=[
+            'fenced_code', # バッククォート3つ (```) によるコードブロック
+            'tables',      # テーブル
+            'nl2br'        # 改行を <br> に変換
+        ],
+    )
+
+    # --- Markdownパーサーが出力する外側の <p> タグを削除 ---
+    # QTextEdit の挿入するHTMLと競合して表示がおかしくなるのを防ぐため
+    if content.startswith('<p>') and content.endswith('</p>'):
+        # <p>...</p> のタグ部分のみを削除
+        content = content[3:-4]
+    return _with_list_spacer(content)
+
+
+def _with_list_spacer(content: str) -> str:
+    if content.rstrip().endswith(('</ul>', '</ol>')):
+        return content + _LIST_SPACER
+    return content
 
 
 class ConversationWidget(QWidget):
@@ -262,43 +311,27 @@ class ConversationWidget(QWidget):
 
     def _render_messages(self, messages: Iterable[ChatMessage]) -> None:
         self._transcript.clear()
+        cursor = self._transcript.textCursor()
+        # 1 つの編集ブロックにまとめ、レイアウト更新をメッセージごとではなく最後に 1 回だけ行う
+        cursor.beginEditBlock()
         for message in messages:
-            self._transcript.insertHtml(self._format_message(message))
-            self._transcript.insertPlainText("\n")
+            cursor.insertHtml(self._format_message(message))
+            cursor.insertText("\n")
+        cursor.endEditBlock()
         self._transcript.moveCursor(QTextCursor.End)
 
     def _format_message(self, message: ChatMessage) -> str:
         if message.role == "user":
-            role_label = "👤 あなた"
-            color = "blue"  # ユーザーは青
-            # ユーザー入力はMarkdownではないと想定し、シンプルにエスケープと改行処理
+            # ユーザー入力はMarkdownではないと想定し、シンプルにエスケープと改行処理（ユーザーは青）
             content = html.escape(message.content).replace("\n", "<br>")
-        else:
-            role_label = f"🤖 {self._assistant_label}"
-            color = "green"  # アシスタントは緑
-            
-            # 外部ライブラリ (markdown) を使用して、MarkdownをHTMLに変換
-            content = markdown.markdown(
-                message.content, 
-                extensions=[
-                    'fenced_code', # バッククォート3つ (```) によるコードブロック
-                    'tables',      # テーブル
-                    'nl2br'        # 改行を <br> に変換
-                ]
-            )
-            
-            # --- Markdownパーサーが出力する外側の <p> タグを削除 ---
-            # QTextEdit の挿入するHTMLと競合して表示がおかしくなるのを防ぐため
-            if content.startswith('<p>') and content.endswith('</p>'):
-                # <p>...</p> のタグ部分のみを削除
-                content = content[3:-4]
-
-        if content.strip().endswith(('</ul>', '</ol>')):
-           content += '<div style="height:0; line-height:0; margin:0; padding:0;"></div>'
-        
-        role_html = f'<p style="margin-bottom:0px;"><b style="color:{color}">{role_label}</b></p>'
-        
-        return f'<div style="margin-bottom: 10px;">{role_html}{content}</div>'
+            return _MESSAGE_TEMPLATE.format(color="blue", label=_USER_LABEL, content=content)
+
+        # アシスタントは緑。Markdown を HTML に変換した結果はキャッシュされる
+        return _MESSAGE_TEMPLATE.format(
+            color="green",
+            label=f"🤖 {self._assistant_label}",
+            content=_assistant_content_html(message.content),
+        )
     
     def _refresh_controls(self) -> None:
         disable_send = self._is_busy or self._is_recording
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from datetime import datetime
+from functools import lru_cache
 from typing import Iterable
 
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QLabel,
+    QListView,
     QListWidget,
     QListWidgetItem,
     QPushButton,
@@ -25,6 +28,11 @@ class HistoryPanel(QWidget):
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self._conversations: list[Conversation] = []
+        # 会話 ID ごとのリスト項目と最後に表示したタイトル（差分更新用）
+        self._id_to_item: dict[str, QListWidgetItem] = {}
+        self._rendered_titles: dict[str, str] = {}
+        # 前回反映した一覧の内容。同じ内容での再設定は何もせずに返す
+        self._last_signature: tuple[tuple[str, str, bool, str], ...] = ()
 
         self._mode_label = QLabel("", self)
         self._mode_label.setObjectName("HistoryModeLabel")
@@ -32,6 +40,11 @@ class HistoryPanel(QWidget):
         self._mode_label.setStyleSheet("font-weight: 600; font-size: 14px;")
 
         self._list = QListWidget(self)
+        # 各行は 1 行のタイトルだけなので高さを共通化し、項目ごとの sizeHint 計算とレイアウトを省く
+        self._list.setUniformItemSizes(True)
+        self._list.setLayoutMode(QListView.Batched)
+        self._list.setBatchSize(64)
+        self._list.setResizeMode(QListView.Adjust)
         # クリックイベント中に会話ロードを行うため、selectionChanged で拾う
         self._list.itemSelectionChanged.connect(self._on_selection_changed)
 
@@ -62,18 +75,50 @@ class HistoryPanel(QWidget):
         self._mode_label.setText(label)
 
     def set_conversations(self, conversations: Iterable[Conversation]) -> None:
-        selected_id = self.current_conversation_id
         self._conversations = list(conversations)
-        # リストを再構築する間は選択シグナルを止めて無限ループを防ぐ
+        signature = tuple(
+            (conversation.conversation_id, conversation.title, conversation.is_favorite, conversation.updated_at)
+            for conversation in self._conversations
+        )
+        if signature == self._last_signature:
+            return
+        self._last_signature = signature
+        selected_id = self.current_conversation_id
+        new_ids = {conversation.conversation_id for conversation in self._conversations}
+        # 差分を反映する間は選択シグナルを止めて無限ループを防ぎ、再描画も最後の 1 回にまとめる
         self._list.blockSignals(True)
-        self._list.clear()
-        for conversation in self._conversations:
-            item = QListWidgetItem(self._format_title(conversation))
-            item.setData(Qt.UserRole, conversation.conversation_id)
-            self._list.addItem(item)
-            if conversation.conversation_id == selected_id:
-                self._list.setCurrentItem(item)
-        self._list.blockSignals(False)
+        self._list.setUpdatesEnabled(False)
+        try:
+            for conversation_id in [cid for cid in self._id_to_item if cid not in new_ids]:
+                item = self._id_to_item.pop(conversation_id)
+                self._rendered_titles.pop(conversation_id, None)
+                self._list.takeItem(self._list.row(item))
+
+            for row, conversation in enumerate(self._conversations):
+                conversation_id = conversation.conversation_id
+                title = self._format_title(conversation)
+                item = self._id_to_item.get(conversation_id)
+                if item is None:
+                    item = QListWidgetItem(title)
+                    item.setData(Qt.UserRole, conversation_id)
+                    self._list.insertItem(row, item)
+                    self._id_to_item[conversation_id] = item
+                else:
+                    current = self._list.item(row)
+                    if current is None or current.data(Qt.UserRole) != conversation_id:
+                        # 並び順が変わった項目だけを目的の位置へ移動する
+                        self._list.takeItem(self._list.row(item))
+                        self._list.insertItem(row, item)
+                    if self._rendered_titles.get(conversation_id) != title:
+                        item.setText(title)
+                self._rendered_titles[conversation_id] = title
+
+            selected_item = self._id_to_item.get(selected_id) if selected_id else None
+            if selected_item is not None:
+                self._list.setCurrentItem(selected_item)
+        finally:
+            self._list.setUpdatesEnabled(True)
+            self._list.blockSignals(False)
         if not self._list.currentItem() and self._list.count() > 0:
             self._list.setCurrentRow(0)
         # 🗑️ ボタンの状態を更新
@@ -99,16 +144,9 @@ class HistoryPanel(QWidget):
         return item.data(Qt.UserRole)
 
     def _format_title(self, conversation: Conversation) -> str:
-        from datetime import datetime
-
-        star = "★" if conversation.is_favorite else "☆"
-        try:
-            dt = datetime.fromisoformat(conversation.updated_at)
-            timestamp = dt.strftime("%Y-%m-%d %H:%M")
-        except ValueError:
-            timestamp = conversation.updated_at
-        # 一覧表示では最終更新日時を添えることで状況を把握しやすくする
-        return f"{star} {conversation.title}  ({timestamp})"
+        return _format_title_cached(
+            conversation.updated_at, conversation.is_favorite, conversation.title
+        )
 
     def _on_selection_changed(self) -> None:
         conversation_id = self.current_conversation_id
@@ -132,4 +170,26 @@ class HistoryPanel(QWidget):
     def _update_button_states(self) -> None:
         is_selected = self.current_conversation_id is not None
         self._favorite_button.setEnabled(is_selected)
-        self._delete_button.setEnabled(is_selected)
\ No newline at end of file
+        self._delete_button.setEnabled(is_selected)
+
+
+@lru_cache(maxsize=1024)
+def _format_title_cached(updated_at: str, is_favorite: bool, title: str) -> str:
+    # 同じ会話を再描画するたびに日時を解析し直さないよう、表示文字列をキャッシュする
+    star = "★" if is_favorite else "☆"
+    # utc_now_iso() の "YYYY-MM-DDTHH:MM:SS+00:00" は先頭 16 文字をそのまま使えば足りる
+    if (
+        len(updated_at) >= 16
+        and updated_at[10] == "T"
+        and updated_at[4] == updated_at[7] == "-"
+        and updated_at[13] == ":"
+    ):
+        timestamp = f"{updated_at[:10]} {updated_at[11:16]}"
+    else:
+        try:
+            dt = datetime.fromisoformat(updated_at)
+            timestamp = dt.strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            timestamp = updated_at
+    # 一覧表示では最終更新日時を添えることで状況を把握しやすくする
+    return f"{star} {title}  ({timestamp})"
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+from collections import deque
 from pathlib import Path
 from typing import Optional
 
-from PySide6.QtCore import QThread
+from PySide6.QtCore import QThread, QThreadPool, Signal
 from PySide6.QtWidgets import (
     QComboBox,
     QHBoxLayout,
@@ -24,8 +26,8 @@ from ..llm_client import LocalLLM
 from ..models import ChatMessage, Conversation
 from ..resources import resource_path
 from ..settings import get_str_setting
-from ..speech_recognizer import SpeechRecognizer
-from ..voicevox_client import DEFAULT_VOICEVOX_URL, VoiceVoxClient, sanitize_voice_text
+from ..speech_recognizer import SpeechRecognizer, SpeechStream
+from ..voicevox_client import DEFAULT_VOICEVOX_URL, VoiceVoxClient
 from .conversation_widget import ConversationWidget
 from .history_panel import HistoryPanel
 from .audio_recorder import AudioRecorder
@@ -43,6 +45,9 @@ TOPIC_DEBUG_ENV = "MINDCHAT_DEBUG_TOPICS"
 
 
 class MainWindow(QMainWindow):
+    # 常駐する LLMWorker.generate へ推論スレッド越しに依頼を渡すためのシグナル
+    _llm_requested = Signal(object, object, object, object, bool)
+
     def __init__(self, config: AppConfig, parent: QWidget | None = None) -> None:
         super().__init__(parent)
 
@@ -72,12 +77,16 @@ class MainWindow(QMainWindow):
             self._llm_error = str(exc)
 
         self._topic_router = CounselingTopicRouter(config)
+        # 初回発話時の埋め込みモデル読み込み待ちを避けるため、起動直後に裏で読み込んでおく
+        threading.Thread(target=self._topic_router.prewarm, daemon=True).start()
 
-        self._worker_thread: QThread | None = None
-        self._worker: LLMWorker | None = None
-        self._speech_thread: QThread | None = None
+        # LLM は専用スレッドに常駐させたワーカーで推論し、llama.cpp を常に同じスレッドから使う
+        self._llm_thread: QThread | None = None
+        self._llm_worker: LLMWorker | None = None
+        self._llm_in_flight = False
         self._speech_worker: SpeechWorker | None = None
         self._speech_recognizer = SpeechRecognizer(config)
+        self._speech_stream: SpeechStream | None = None
         self._audio_recorder = AudioRecorder(self)
         voicevox_url = get_str_setting(
             config.settings, "voicevox.base_url", DEFAULT_VOICEVOX_URL
@@ -85,12 +94,16 @@ class MainWindow(QMainWindow):
         self._voice_client = VoiceVoxClient(voicevox_url)
         self._voice_player = VoicePlayer(self)
         self._voice_player.error.connect(self._handle_voice_player_error)
-        self._voice_thread: QThread | None = None
+        # 音声合成はスレッドプールで実行し、リクエストごとのスレッド生成を避ける
+        self._voice_pool = self._create_worker_pool()
         self._voice_worker: VoiceVoxWorker | None = None
         self._voice_enabled = False
         self._voice_speaker_id = 14
         self._voice_request_id = 0
-        self._pending_voice_request: tuple[str, int] | None = None
+        # 合成待ちのテキスト（文単位）と、その応答に割り当てた request_id
+        self._voice_queue: deque[tuple[str, int]] = deque()
+        # 実行中の LLM 応答を文単位で読み上げているかどうか
+        self._voice_streamed = False
         self._voice_error_shown = False
         self._is_llm_busy = False
         self._is_recording = False
@@ -145,6 +158,7 @@ class MainWindow(QMainWindow):
         self._audio_recorder.recording_started.connect(self._handle_recording_started)
         self._audio_recorder.recording_stopped.connect(self._handle_recording_stopped)
         self._audio_recorder.audio_ready.connect(self._handle_audio_ready)
+        self._audio_recorder.chunk_captured.connect(self._handle_audio_chunk)
         self._audio_recorder.error.connect(self._handle_recording_error)
 
         self._apply_mode_theme(self._active_mode)
@@ -278,7 +292,7 @@ class MainWindow(QMainWindow):
             )
             return
 
-        if self._worker_thread and self._worker_thread.isRunning():
+        if self._llm_in_flight:
             # すでに別レスポンスを計算中ならキューを増やさずに無視
             return
 
@@ -298,28 +312,33 @@ class MainWindow(QMainWindow):
                 topic_state.turns,
             )
 
-        self._worker = LLMWorker(
-            self._llm_client,
-            conversation.messages,
+        self._voice_streamed = self._voice_enabled
+        if self._voice_streamed:
+            self._begin_voice_output()
+        self._ensure_llm_worker()
+        self._llm_in_flight = True
+        self._llm_requested.emit(
+            list(conversation.messages),
             self._active_mode.system_prompt,
-            topic_router=topic_router,
-            topic_state=topic_state,
+            topic_router,
+            topic_state,
+            self._voice_streamed,
         )
-        self._worker_thread = QThread(self)
-
-        self._worker.moveToThread(self._worker_thread)
-        self._worker_thread.started.connect(self._worker.run)
-        self._worker.finished.connect(self._handle_llm_success)
-        self._worker.failed.connect(self._handle_llm_failure)
-        self._worker.finished.connect(self._worker_thread.quit)
-        self._worker.failed.connect(self._worker_thread.quit)
-        self._worker.finished.connect(self._cleanup_worker)
-        self._worker.failed.connect(self._cleanup_worker)
-        self._worker.finished.connect(self._worker.deleteLater)
-        self._worker.failed.connect(self._worker.deleteLater)
-        self._worker_thread.finished.connect(self._worker_thread.deleteLater)
-
-        self._worker_thread.start()
+
+    def _ensure_llm_worker(self) -> None:
+        if self._llm_worker is not None:
+            return
+        self._llm_worker = LLMWorker(self._llm_client)
+        self._llm_thread = QThread(self)
+        self._llm_worker.moveToThread(self._llm_thread)
+        self._llm_worker.sentence_ready.connect(self._handle_llm_sentence)
+        self._llm_worker.finished.connect(self._handle_llm_success)
+        self._llm_worker.failed.connect(self._handle_llm_failure)
+        self._llm_worker.finished.connect(self._finish_llm_request)
+        self._llm_worker.failed.connect(self._finish_llm_request)
+        self._llm_requested.connect(self._llm_worker.generate)
+        self._llm_thread.finished.connect(self._llm_worker.deleteLater)
+        self._llm_thread.start()
 
     def _handle_llm_success(self, response: str, topic_update: TopicUpdate | None) -> None:
         conversation_id = self._get_active_conversation_id()
@@ -335,7 +354,8 @@ class MainWindow(QMainWindow):
             # リサイズ等で transcript が崩れても履歴から再描画して確実に反映する
             self._conversation_widget.display_conversation(conversation)
             self._refresh_history_panel(select_id=conversation.conversation_id)
-            self._queue_voice_output(response)
+            if not self._voice_streamed:
+                self._queue_voice_output(response)
         except Exception as exc:  # pragma: no cover - UI robustness
             logger.exception("Failed to render assistant response", exc_info=exc)
             self._show_warning(
@@ -370,6 +390,9 @@ class MainWindow(QMainWindow):
         )
 
     def _handle_llm_failure(self, error_message: str) -> None:
+        if self._voice_streamed:
+            # 巻き戻した応答の読み上げは途中でも止める
+            self._begin_voice_output()
         try:
             conversation_id = self._get_active_conversation_id()
             if conversation_id:
@@ -381,13 +404,16 @@ class MainWindow(QMainWindow):
         # エラー内容はダイアログで通知し、巻き戻したことが視覚的にわかるようにする
         self._show_warning("応答生成に失敗しました", error_message)
 
-    def _cleanup_worker(self) -> None:
-        self._worker = None
-        self._worker_thread = None
+    def _finish_llm_request(self) -> None:
+        self._llm_in_flight = False
 
     # Speech input coordination -----------------------------------------
     def _handle_recording_started(self) -> None:
         self._is_recording = True
+        # 16kHz/mono/Int16 で録音できる場合は録音と並行して認識を進めておく
+        self._speech_stream = None
+        if self._audio_recorder.is_target_format:
+            self._speech_stream = self._speech_recognizer.open_stream(self._audio_recorder.sample_rate)
         self._conversation_widget.set_recording_state(True, "録音中...（最大2分／無音30秒で自動停止）")
         self._refresh_interaction_locks()
 
@@ -400,8 +426,13 @@ class MainWindow(QMainWindow):
             self._conversation_widget.set_status_text("")
         self._refresh_interaction_locks()
 
+    def _handle_audio_chunk(self, chunk: bytes) -> None:
+        if self._speech_stream is not None:
+            self._speech_stream.feed(chunk)
+
     def _handle_recording_error(self, message: str) -> None:
         self._is_recording = False
+        self._speech_stream = None
         self._conversation_widget.set_recording_state(False)
         self._conversation_widget.set_status_text(message)
         self._refresh_interaction_locks()
@@ -410,12 +441,15 @@ class MainWindow(QMainWindow):
     def _handle_audio_ready(self, payload: object) -> None:
         if not isinstance(payload, tuple):
             return
+        already_target = False
         if len(payload) == 2:
             pcm_bytes, sample_rate = payload
             channels = 1
             sample_format = "int16"
         elif len(payload) == 4:
             pcm_bytes, sample_rate, channels, sample_format = payload
+        elif len(payload) == 5:
+            pcm_bytes, sample_rate, channels, sample_format, already_target = payload
         else:
             return
         try:
@@ -426,8 +460,11 @@ class MainWindow(QMainWindow):
         except Exception:
             return
 
+        stream, self._speech_stream = self._speech_stream, None
         self._conversation_widget.set_status_text("音声を解析しています...")
-        self._start_speech_worker(pcm_bytes, sample_rate_int, channels_int, sample_format_text)
+        self._start_speech_worker(
+            pcm_bytes, sample_rate_int, channels_int, sample_format_text, bool(already_target), stream
+        )
 
     def _start_speech_worker(
         self,
@@ -435,30 +472,32 @@ class MainWindow(QMainWindow):
         sample_rate: int,
         channels: int,
         sample_format: str,
+        already_target: bool = False,
+        stream: SpeechStream | None = None,
     ) -> None:
-        if self._speech_thread and self._speech_thread.isRunning():
+        if self._speech_worker is not None:
             return
 
+        # 認識は SpeechRecognizer が保持する専用スレッドで行い、結果だけをシグナルで受け取る
         self._speech_worker = SpeechWorker(
-            self._speech_recognizer, pcm_bytes, sample_rate, channels, sample_format
+            self._speech_recognizer,
+            pcm_bytes,
+            sample_rate,
+            channels,
+            sample_format,
+            already_target,
+            stream,
         )
-        self._speech_thread = QThread(self)
-
-        self._speech_worker.moveToThread(self._speech_thread)
-        self._speech_thread.started.connect(self._speech_worker.run)
         self._speech_worker.recognized.connect(self._handle_recognition_success)
         self._speech_worker.failed.connect(self._handle_recognition_failure)
-        self._speech_worker.recognized.connect(self._speech_thread.quit)
-        self._speech_worker.failed.connect(self._speech_thread.quit)
         self._speech_worker.recognized.connect(self._cleanup_speech_worker)
         self._speech_worker.failed.connect(self._cleanup_speech_worker)
         self._speech_worker.recognized.connect(self._speech_worker.deleteLater)
         self._speech_worker.failed.connect(self._speech_worker.deleteLater)
-        self._speech_thread.finished.connect(self._speech_thread.deleteLater)
 
         # 音声解析中は誤操作防止のため録音ボタンを無効化
         self._conversation_widget.set_record_button_enabled(False)
-        self._speech_thread.start()
+        self._speech_worker.start()
 
     def _handle_recognition_success(self, text: str) -> None:
         self._conversation_widget.append_text_to_input(text)
@@ -470,7 +509,6 @@ class MainWindow(QMainWindow):
 
     def _cleanup_speech_worker(self) -> None:
         self._speech_worker = None
-        self._speech_thread = None
         self._refresh_interaction_locks()
         # 録音が終了していて LLM も空きならステータスを消しておく
         if not self._is_llm_busy and not self._is_recording:
@@ -482,9 +520,7 @@ class MainWindow(QMainWindow):
         if enabled:
             self._voice_error_shown = False
             return
-        self._pending_voice_request = None
-        self._voice_request_id += 1
-        self._voice_player.stop()
+        self._begin_voice_output()
 
     def _handle_voice_speaker_changed(self, speaker_id: int) -> None:
         self._voice_speaker_id = speaker_id
@@ -492,52 +528,58 @@ class MainWindow(QMainWindow):
     def _queue_voice_output(self, text: str) -> None:
         if not self._voice_enabled:
             return
-        cleaned = sanitize_voice_text(text)
-        if not cleaned:
+        if not text.strip():
+            return
+        self._begin_voice_output()
+        self._enqueue_voice_text(text)
+
+    def _handle_llm_sentence(self, sentence: str) -> None:
+        if not self._voice_enabled or not self._voice_streamed:
             return
+        if sentence.strip():
+            # Markdown 記法の除去は合成スレッド側で行う
+            self._enqueue_voice_text(sentence)
 
+    def _begin_voice_output(self) -> None:
+        # 新しい応答の読み上げを始める前に、古い応答の合成待ちと再生を破棄する
         self._voice_request_id += 1
-        request_id = self._voice_request_id
-        self._pending_voice_request = (cleaned, request_id)
+        self._voice_queue.clear()
         self._voice_player.stop()
 
-        if self._voice_thread and self._voice_thread.isRunning():
-            return
+    def _enqueue_voice_text(self, text: str) -> None:
+        self._voice_queue.append((text, self._voice_request_id))
         self._start_pending_voice_request()
 
     def _start_pending_voice_request(self) -> None:
-        if not self._pending_voice_request:
+        if not self._voice_queue:
             return
-        if self._voice_thread and self._voice_thread.isRunning():
+        if self._voice_worker is not None:
             return
 
-        text, request_id = self._pending_voice_request
-        self._pending_voice_request = None
-
-        self._voice_worker = VoiceVoxWorker(self._voice_client, text, self._voice_speaker_id, request_id)
-        self._voice_thread = QThread(self)
+        # 合成中に溜まった同じ応答の文はまとめて 1 回で合成し、文の順序どおりに再生キューへ積む
+        text, request_id = self._voice_queue.popleft()
+        texts = [text]
+        while self._voice_queue and self._voice_queue[0][1] == request_id:
+            texts.append(self._voice_queue.popleft()[0])
 
-        self._voice_worker.moveToThread(self._voice_thread)
-        self._voice_thread.started.connect(self._voice_worker.run)
-        self._voice_worker.finished.connect(self._handle_voice_success)
-        self._voice_worker.failed.connect(self._handle_voice_failure)
-        self._voice_worker.finished.connect(self._voice_thread.quit)
-        self._voice_worker.failed.connect(self._voice_thread.quit)
-        self._voice_worker.finished.connect(self._voice_worker.deleteLater)
-        self._voice_worker.failed.connect(self._voice_worker.deleteLater)
-        self._voice_thread.finished.connect(self._voice_thread.deleteLater)
-        self._voice_thread.finished.connect(self._on_voice_thread_finished)
+        self._voice_worker = VoiceVoxWorker(self._voice_client, texts, self._voice_speaker_id, request_id)
+        signals = self._voice_worker.signals
+        signals.finished.connect(self._handle_voice_success)
+        signals.failed.connect(self._handle_voice_failure)
+        signals.finished.connect(self._on_voice_worker_finished)
+        signals.failed.connect(self._on_voice_worker_finished)
 
-        self._voice_thread.start()
+        self._voice_pool.start(self._voice_worker)
 
     def _handle_voice_success(self, audio: object, request_id: int) -> None:
         if not self._voice_enabled:
             return
         if request_id != self._voice_request_id:
             return
-        if not isinstance(audio, (bytes, bytearray)):
+        if not isinstance(audio, list):
             return
-        self._voice_player.play_bytes(bytes(audio))
+        for clip in audio:
+            self._voice_player.enqueue_bytes(clip)
 
     def _handle_voice_failure(self, error_message: str, request_id: int) -> None:
         if not self._voice_enabled:
@@ -553,9 +595,8 @@ class MainWindow(QMainWindow):
             self._voice_error_shown = True
             self._show_warning("音声再生に失敗しました", message)
 
-    def _on_voice_thread_finished(self) -> None:
+    def _on_voice_worker_finished(self) -> None:
         self._voice_worker = None
-        self._voice_thread = None
         self._start_pending_voice_request()
 
     # Helpers ------------------------------------------------------------
@@ -750,17 +791,21 @@ class MainWindow(QMainWindow):
         self._media_cache[mode.key] = None
         return None
 
+    def _create_worker_pool(self) -> QThreadPool:
+        # 1 本のスレッドを使い回して順番に処理する（アイドルでもスレッドを破棄しない）
+        pool = QThreadPool(self)
+        pool.setMaxThreadCount(1)
+        pool.setExpiryTimeout(-1)
+        return pool
+
     def closeEvent(self, event) -> None:  # type: ignore[override]
-        if self._worker_thread and self._worker_thread.isRunning():
-            # アプリ終了前にバックグラウンドの推論スレッドを安全に停止
-            self._worker_thread.quit()
-            self._worker_thread.wait()
-        if self._speech_thread and self._speech_thread.isRunning():
-            self._speech_thread.quit()
-            self._speech_thread.wait()
-        if self._voice_thread and self._voice_thread.isRunning():
-            self._voice_thread.quit()
-            self._voice_thread.wait()
+        # アプリ終了前にバックグラウンドの推論・音声合成が終わるのを待つ
+        if self._llm_thread is not None:
+            self._llm_thread.quit()
+            self._llm_thread.wait()
+        self._speech_recognizer.shutdown()
+        self._voice_pool.waitForDone()
+        self._voice_client.close()
         if self._audio_recorder.is_recording:
             self._audio_recorder.stop()
         self._voice_player.stop()
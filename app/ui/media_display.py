@@ -1,16 +1,26 @@
 from __future__ import annotations
 
 import logging
+from collections import OrderedDict
 from pathlib import Path
 
-from PySide6.QtCore import Qt, QUrl
-from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtCore import QBuffer, QByteArray, QEvent, QFile, QIODevice, QSize, Qt, QTimer, QUrl
+from PySide6.QtGui import QPixmap
 from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer, QVideoFrame, QVideoSink
 from PySide6.QtWidgets import QLabel, QStackedLayout, QSizePolicy, QWidget
 
 
 logger = logging.getLogger(__name__)
 
+# この大きさ未満の動画だけをメモリに読み込む／フレームをキャッシュする（それ以上はファイルから再生）
+_FRAME_CACHE_MAX_FILE_BYTES = 50 * 1024 * 1024
+# メモリに保持しておく動画ファイルの合計サイズ（モード切り替えで行き来する程度を想定）
+_VIDEO_CACHE_MAX_BYTES = 100 * 1024 * 1024
+# 短いループ動画は 1 周分のフレームを保持し、以降はデコードせずタイマーで回す
+_FRAME_CACHE_MAX_BYTES = 192 * 1024 * 1024
+# 頭出し直後とみなすフレーム時刻（マイクロ秒）。これより後のフレームは頭出し前の残りとして捨てる
+_FRAME_CACHE_START_US = 100_000
+
 
 class MediaDisplayWidget(QWidget):
     def __init__(self, parent: QWidget | None = None) -> None:
@@ -19,7 +29,38 @@ class MediaDisplayWidget(QWidget):
         self._audio_output: QAudioOutput | None = None
         self._current_pixmap: QPixmap | None = None
         self._video_sink: QVideoSink | None = None
-        self._current_video_image: QImage | None = None
+        self._current_video_pixmap: QPixmap | None = None
+        # 前のフレームがまだ描画されていない間は新しいフレームを捨てる
+        self._frame_pending = False
+        # 同じ元画像・同じサイズ・同じ補間方法での再スケールを省くためのキー
+        self._pixmap_key: tuple | None = None
+        self._video_key: tuple | None = None
+        # 動画ファイルの中身をメモリに保持し、同じ動画の再表示でディスクを読み直さない
+        self._video_cache: OrderedDict[str, QByteArray] = OrderedDict()
+        self._video_cache_bytes = 0
+        self._video_buffer: QBuffer | None = None
+        self._video_source: str | None = None
+        # 1 周分のデコード済みフレーム（_frame_cache_source の動画のもの）
+        self._frame_cache: list[QPixmap] = []
+        self._frame_times: list[int] = []
+        self._frame_cache_bytes = 0
+        self._frame_cache_source: str | None = None
+        # キャッシュしたフレームはこの表示サイズに合わせて縮小済み（サイズが変わったら集め直す）
+        self._frame_cache_size = QSize()
+        self._frame_cache_ready = False
+        self._collecting_frames = False
+        # キャッシュ再生に向かない動画と、その面積（この面積以上ではキャッシュしない。0 なら常に不可）
+        self._frame_cache_skip: dict[str, int] = {}
+        self._frame_index = 0
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setTimerType(Qt.PreciseTimer)
+        self._frame_timer.timeout.connect(self._show_next_cached_frame)
+
+        # リサイズ中は高速な補間で追従し、操作が落ち着いたら 1 回だけ高品質に描き直す
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(16)
+        self._resize_timer.timeout.connect(self._apply_smooth)
 
         self._stack = QStackedLayout(self)
 
@@ -34,6 +75,7 @@ class MediaDisplayWidget(QWidget):
         self._video_label = QLabel(self)
         self._video_label.setAlignment(Qt.AlignCenter)
         self._video_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self._video_label.installEventFilter(self)
 
         self._stack.addWidget(self._placeholder)
         self._stack.addWidget(self._image_label)
@@ -49,6 +91,7 @@ class MediaDisplayWidget(QWidget):
             if path:
                 logger.warning("Image not found: %s", path)
             self._image_label.clear()
+            self._pixmap_key = None
             self._stack.setCurrentWidget(self._placeholder)
             return
 
@@ -72,46 +115,61 @@ class MediaDisplayWidget(QWidget):
             self._stack.setCurrentWidget(self._placeholder)
             return
 
-        player = self._ensure_player()
-        self._current_video_image = None
+        self._current_video_pixmap = None
+        self._frame_pending = False
+        self._video_key = None
         self._video_label.clear()
-        player.setVideoSink(self._video_sink)
-        # PySide6 の QMediaPlayer には URL を渡す必要がある
-        player.setSource(QUrl.fromLocalFile(str(path)))
-        player.play()
         self._stack.setCurrentWidget(self._video_label)
+        self._start_video_playback(path)
 
     def clear(self) -> None:
         self._stop_video()
         self._current_pixmap = None
+        self._pixmap_key = None
         self._image_label.clear()
         self._stack.setCurrentWidget(self._placeholder)
 
     def resizeEvent(self, event) -> None:  # type: ignore[override]
         super().resizeEvent(event)
+        self._apply_pixmap(Qt.FastTransformation)
+        self._apply_video_frame(Qt.FastTransformation)
+        self._resize_timer.start()
+
+    def _apply_smooth(self) -> None:
         self._apply_pixmap()
         self._apply_video_frame()
+        self._sync_frame_cache_size()
 
-    def _apply_pixmap(self) -> None:
+    def _apply_pixmap(self, mode: Qt.TransformationMode = Qt.SmoothTransformation) -> None:
         if not self._current_pixmap:
             return
-        scaled = self._current_pixmap.scaled(
-            self._image_label.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
-        )
+        target = self._image_label.size()
+        key = (self._current_pixmap.cacheKey(), target.width(), target.height(), mode)
+        if key == self._pixmap_key:
+            return
+        self._pixmap_key = key
+        scaled = self._current_pixmap.scaled(target, Qt.KeepAspectRatio, mode)
         self._image_label.setPixmap(scaled)
 
-    def _apply_video_frame(self) -> None:
-        if not self._current_video_image:
+    def _apply_video_frame(self, mode: Qt.TransformationMode = Qt.SmoothTransformation) -> None:
+        if not self._current_video_pixmap:
             return
-        pixmap = QPixmap.fromImage(self._current_video_image)
-        scaled = pixmap.scaled(
-            self._video_label.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
-        )
+        target = self._video_label.size()
+        key = (self._current_video_pixmap.cacheKey(), target.width(), target.height(), mode)
+        if key == self._video_key:
+            return
+        self._video_key = key
+        scaled = self._current_video_pixmap.scaled(target, Qt.KeepAspectRatio, mode)
         self._video_label.setPixmap(scaled)
+        # 描画されない状態（非表示・サイズ 0・最小化）では Paint が来ないので、待ち状態にしない
+        self._frame_pending = self._video_label_can_paint()
+
+    def _video_label_can_paint(self) -> bool:
+        return (
+            self._video_label.isVisible()
+            and not self._video_label.size().isEmpty()
+            and not self.window().isMinimized()
+        )
 
     def _ensure_player(self) -> QMediaPlayer:
         if self._player is not None:
@@ -131,16 +189,245 @@ class MediaDisplayWidget(QWidget):
         self._player.setAudioOutput(self._audio_output)
         return self._player
 
+    def _set_video_source(self, player: QMediaPlayer, path: Path) -> None:
+        key = str(path)
+        if key == self._video_source:
+            # 同じ動画なら読み込み済みのソースをそのまま先頭から再生する
+            return
+        data = self._load_video_bytes(path)
+        previous = self._video_buffer
+        if data is None:
+            # PySide6 の QMediaPlayer には URL を渡す必要がある
+            player.setSource(QUrl.fromLocalFile(key))
+            self._video_buffer = None
+        else:
+            buffer = QBuffer(self)
+            buffer.setData(data)
+            buffer.open(QIODevice.ReadOnly)
+            # URL はフォーマット判定のヒントとしてだけ使われる
+            player.setSourceDevice(buffer, QUrl.fromLocalFile(key))
+            self._video_buffer = buffer
+        self._video_source = key
+        if previous is not None:
+            previous.close()
+            previous.deleteLater()
+
+    def _load_video_bytes(self, path: Path) -> QByteArray | None:
+        key = str(path)
+        data = self._video_cache.get(key)
+        if data is not None:
+            self._video_cache.move_to_end(key)
+            return data
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return None
+        if size >= _FRAME_CACHE_MAX_FILE_BYTES:
+            # 大きな動画は GUI スレッドで読み込まず、ファイルから直接再生する
+            return None
+        file = QFile(key)
+        if not file.open(QIODevice.ReadOnly):
+            logger.warning("Failed to read video into memory: %s", key)
+            return None
+        try:
+            data = file.readAll()
+        finally:
+            file.close()
+        self._video_cache[key] = data
+        self._video_cache_bytes += data.size()
+        while self._video_cache_bytes > _VIDEO_CACHE_MAX_BYTES and len(self._video_cache) > 1:
+            _, evicted = self._video_cache.popitem(last=False)
+            self._video_cache_bytes -= evicted.size()
+        return data
+
+    def _release_video_source(self) -> None:
+        # フレームキャッシュで再生できるようになった動画はデコーダーを手放す。
+        # ファイルの中身は表示サイズやモードが変わって集め直すときのために残しておく
+        if self._player:
+            self._player.setSource(QUrl())
+        if self._video_buffer is not None:
+            self._video_buffer.close()
+            self._video_buffer.deleteLater()
+            self._video_buffer = None
+        self._video_source = None
+
+    def _start_video_playback(self, path: Path) -> None:
+        key = str(path)
+        if self._frame_cache_source != key:
+            self._reset_frame_cache()
+            self._frame_cache_source = key
+        if self._play_cached_frames(key):
+            return
+
+        self._reset_frame_cache()
+        player = self._ensure_player()
+        player.setVideoSink(self._video_sink)
+        self._set_video_source(player, path)
+        target = self._video_label.size()
+        if self._can_cache_frames(path, target):
+            self._collecting_frames = True
+            self._frame_cache_size = target
+        # 1 周分を先頭から集められるよう、同じソースの再生中でも頭出しする
+        player.setPosition(0)
+        player.play()
+
+    def _can_cache_frames(self, path: Path, target: QSize) -> bool:
+        if target.isEmpty():
+            return False
+        key = str(path)
+        limit = self._frame_cache_skip.get(key)
+        if limit is not None and target.width() * target.height() >= limit:
+            return False
+        try:
+            small_enough = path.stat().st_size < _FRAME_CACHE_MAX_FILE_BYTES
+        except OSError:
+            small_enough = False
+        if not small_enough:
+            self._frame_cache_skip[key] = 0
+        return small_enough
+
+    def _sync_frame_cache_size(self) -> None:
+        # リサイズが落ち着いたら、表示サイズに合ったフレームキャッシュを 1 回だけ作り直す
+        key = self._frame_cache_source
+        if key is None or self._stack.currentWidget() is not self._video_label:
+            return
+        target = self._video_label.size()
+        if self._frame_cache_ready or self._collecting_frames:
+            if self._frame_cache_size == target:
+                return
+        elif not self._can_cache_frames(Path(key), target):
+            return
+        self._start_video_playback(Path(key))
+
+    def _collect_video_frame(self, frame: QVideoFrame) -> None:
+        start_time = frame.startTime()
+        if start_time < 0:
+            self._abandon_frame_collection(skip_area=0)
+            return
+        if not self._frame_times and start_time > _FRAME_CACHE_START_US:
+            # 頭出し前にデコードされたフレームがキューに残っていることがあるので、先頭が来るまで待つ
+            return
+        if self._frame_times and start_time <= self._frame_times[-1]:
+            if self._frame_times[-1] <= _FRAME_CACHE_START_US:
+                # 先頭付近の残りフレームの後に本当の先頭が来ただけなので、ここから集め直す
+                self._frame_cache = []
+                self._frame_times = []
+                self._frame_cache_bytes = 0
+            else:
+                # 先頭に巻き戻ったので 1 周分そろった
+                self._finish_frame_collection()
+                return
+        image = frame.toImage()
+        if image.isNull():
+            return
+        target = self._frame_cache_size
+        pixmap = QPixmap.fromImage(image.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self._frame_cache_bytes += pixmap.width() * pixmap.height() * 4
+        if self._frame_cache_bytes > _FRAME_CACHE_MAX_BYTES:
+            logger.info("Video frames exceed the cache budget; keeping live decoding")
+            self._abandon_frame_collection(skip_area=target.width() * target.height())
+            return
+        self._frame_cache.append(pixmap)
+        self._frame_times.append(start_time)
+        if not self._frame_pending:
+            # 集めたフレームは表示サイズに縮小済みなので、そのまま表示に使う
+            self._show_video_pixmap(pixmap)
+
+    def _finish_frame_collection(self) -> None:
+        count = len(self._frame_times)
+        if count < 2:
+            # 取りこぼしなどで 1 周分そろわなかっただけなので、次のリサイズや再表示でまた試す
+            self._abandon_frame_collection()
+            return
+        # フレーム時刻はマイクロ秒。平均間隔でタイマーを回す
+        interval = (self._frame_times[-1] - self._frame_times[0]) / (count - 1) / 1000
+        self._frame_timer.setInterval(max(1, round(interval)))
+        self._collecting_frames = False
+        self._frame_cache_ready = True
+        self._frame_times = []
+        if self._player:
+            self._player.stop()
+            self._player.setVideoSink(None)
+        self._release_video_source()
+        self._run_cached_frames()
+
+    def _abandon_frame_collection(self, skip_area: int | None = None) -> None:
+        if skip_area is not None and self._frame_cache_source:
+            self._frame_cache_skip[self._frame_cache_source] = skip_area
+        self._reset_frame_cache()
+
+    def _reset_frame_cache(self) -> None:
+        self._frame_timer.stop()
+        self._collecting_frames = False
+        self._frame_cache_ready = False
+        self._frame_cache = []
+        self._frame_times = []
+        self._frame_cache_bytes = 0
+        self._frame_cache_size = QSize()
+
+    def _play_cached_frames(self, key: str | None) -> bool:
+        if (
+            not self._frame_cache_ready
+            or key != self._frame_cache_source
+            or self._frame_cache_size != self._video_label.size()
+        ):
+            return False
+        self._run_cached_frames()
+        return True
+
+    def _run_cached_frames(self) -> None:
+        self._frame_index = 0
+        self._show_next_cached_frame()
+        self._frame_timer.start()
+
+    def _show_next_cached_frame(self) -> None:
+        self._show_video_pixmap(self._frame_cache[self._frame_index])
+        self._frame_index = (self._frame_index + 1) % len(self._frame_cache)
+
+    def _show_video_pixmap(self, pixmap: QPixmap) -> None:
+        # 表示サイズに縮小済みのフレームを拡縮せずにそのまま貼る
+        self._current_video_pixmap = pixmap
+        target = self._video_label.size()
+        self._video_key = (pixmap.cacheKey(), target.width(), target.height(), Qt.SmoothTransformation)
+        self._video_label.setPixmap(pixmap)
+        self._frame_pending = self._video_label_can_paint()
+
     def _stop_video(self) -> None:
+        self._frame_timer.stop()
+        if self._collecting_frames:
+            # 1 周そろう前に止めた場合は次回また最初から集め直す
+            self._reset_frame_cache()
         if self._player:
             self._player.stop()
             self._player.setVideoSink(None)
-        self._current_video_image = None
+        self._current_video_pixmap = None
+        self._frame_pending = False
+        self._video_key = None
         self._video_label.clear()
 
+    def eventFilter(self, watched, event) -> bool:  # type: ignore[override]
+        if watched is self._video_label and event.type() in (QEvent.Paint, QEvent.Show, QEvent.Hide):
+            self._frame_pending = False
+        return super().eventFilter(watched, event)
+
     def _handle_video_frame(self, frame: QVideoFrame) -> None:
+        if self._collecting_frames:
+            self._collect_video_frame(frame)
+            return
+        if self._frame_pending:
+            # 背景のループ動画なので、表示が追いつかないフレームは間引いてよい
+            return
         image = frame.toImage()
         if image.isNull():
             return
-        self._current_video_image = image
+        target = self._video_label.size()
+        if (
+            not target.isEmpty()
+            and image.width() >= target.width() * 2
+            and image.height() >= target.height() * 2
+        ):
+            # 表示サイズより十分大きいフレームは先に縮小し、以降のコピーと補間の負荷を減らす
+            image = image.scaled(target * 2, Qt.KeepAspectRatio, Qt.FastTransformation)
+        # QPixmap への変換はフレームごとに 1 回だけ行い、リサイズ時はこれを拡縮する
+        self._current_video_pixmap = QPixmap.fromImage(image)
         self._apply_video_frame()
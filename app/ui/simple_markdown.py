@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import html
+import re
+
+# LLM の返信で使われる Markdown の一部（コードブロック/表/見出し/箇条書き/強調/改行）だけを
+# 事前コンパイルした正規表現で HTML に変換する。markdown ライブラリより桁違いに軽い。
+
+_FENCE = re.compile(r"^```[ \t]*([\w+-]*)[ \t]*\n(.*?)^```[ \t]*$", re.M | re.S)
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_UL_ITEM = re.compile(r"^[*+-]\s+(.*)$")
+_OL_ITEM = re.compile(r"^\d+[.)]\s+(.*)$")
+_TABLE_ROW = re.compile(r"^\s*\|.*\|\s*$")
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+_INLINE_CODE = re.compile(r"`([^`\n]+)`")
+_BOLD = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*|__(?=\S)(.+?)(?<=\S)__")
+_ITALIC = re.compile(r"(?<![*\w])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?![*\w])")
+# 引用/リンク/画像/水平線/入れ子のリストなど、ここで扱わない記法
+_UNSUPPORTED = re.compile(
+    r"^\s*>|^[ \t]+(?:[*+-]|\d+[.)])\s|!?\[[^\]\n]*\]\([^)\n]*\)|^\s*(?:[-*_]\s*){3,}$",
+    re.M,
+)
+_CODE_PLACEHOLDER = "\x00{}\x00"
+_CODE_PLACEHOLDER_RE = re.compile("\x00(\\d+)\x00")
+
+
+def render_markdown(text: str) -> str | None:
+    """Render the Markdown subset used in replies, or return None for unsupported syntax."""
+
+    blocks: list[str] = []
+    position = 0
+    for match in _FENCE.finditer(text):
+        prose = text[position:match.start()]
+        rendered = _render_blocks(prose) if not _UNSUPPORTED.search(prose) else None
+        if rendered is None:
+            return None
+        blocks.extend(rendered)
+        language = match.group(1)
+        attr = f' class="language-{html.escape(language)}"' if language else ""
+        blocks.append(f"<pre><code{attr}>{html.escape(match.group(2), quote=False)}</code></pre>")
+        position = match.end()
+
+    tail = text[position:]
+    rendered = _render_blocks(tail) if not _UNSUPPORTED.search(tail) else None
+    if rendered is None:
+        return None
+    blocks.extend(rendered)
+
+    if len(blocks) == 1 and blocks[0].startswith("<p>"):
+        # 1 段落だけの場合は <p> で包まず、見出し行と同じ流れで表示する
+        return blocks[0][3:-4]
+    return "".join(blocks)
+
+
+def _render_blocks(text: str) -> list[str] | None:
+    blocks: list[str] = []
+    paragraph: list[str] = []
+    list_tag: str | None = None
+    items: list[str] = []
+
+    def flush_paragraph() -> None:
+        if paragraph:
+            blocks.append(f"<p>{'<br>'.join(paragraph)}</p>")
+            paragraph.clear()
+
+    def flush_list() -> None:
+        nonlocal list_tag
+        if list_tag:
+            body = "".join(f"<li>{item}</li>" for item in items)
+            blocks.append(f"<{list_tag}>{body}</{list_tag}>")
+            items.clear()
+            list_tag = None
+
+    lines = text.split("\n")
+    index = 0
+    while index < len(lines):
+        line = lines[index].rstrip()
+        stripped = line.strip()
+        if not stripped:
+            flush_paragraph()
+            flush_list()
+            index += 1
+            continue
+
+        if (
+            _TABLE_ROW.match(line)
+            and index + 1 < len(lines)
+            and _TABLE_SEPARATOR.match(lines[index + 1])
+        ):
+            flush_paragraph()
+            flush_list()
+            rows = [line]
+            index += 2
+            while index < len(lines) and _TABLE_ROW.match(lines[index]):
+                rows.append(lines[index])
+                index += 1
+            blocks.append(_render_table(rows))
+            continue
+        if _TABLE_SEPARATOR.match(line):
+            # 先頭に | のない表など、ここで表と認識できなかった区切り行は markdown ライブラリに任せる
+            return None
+
+        heading = _HEADING.match(stripped)
+        if heading:
+            flush_paragraph()
+            flush_list()
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{_render_inline(heading.group(2))}</h{level}>")
+            index += 1
+            continue
+
+        item = _UL_ITEM.match(stripped)
+        tag = "ul"
+        if item is None:
+            item = _OL_ITEM.match(stripped)
+            tag = "ol"
+        if item is not None:
+            flush_paragraph()
+            if list_tag != tag:
+                flush_list()
+                list_tag = tag
+            items.append(_render_inline(item.group(1)))
+            index += 1
+            continue
+
+        if list_tag and items:
+            # 空行なしで続く行は直前の項目の続きとして扱う
+            items[-1] = f"{items[-1]}<br>{_render_inline(stripped)}"
+        else:
+            paragraph.append(_render_inline(stripped))
+        index += 1
+
+    flush_paragraph()
+    flush_list()
+    return blocks
+
+
+def _render_table(rows: list[str]) -> str:
+    header, *body = (_split_row(row) for row in rows)
+    head_html = "".join(f"<th>{_render_inline(cell)}</th>" for cell in header)
+    body_html = "".join(
+        "<tr>" + "".join(f"<td>{_render_inline(cell)}</td>" for cell in row) + "</tr>"
+        for row in body
+    )
+    return f"<table><thead><tr>{head_html}</tr></thead><tbody>{body_html}</tbody></table>"
+
+
+def _split_row(row: str) -> list[str]:
+    return [cell.strip() for cell in row.strip().strip("|").split("|")]
+
+
+def _render_inline(text: str) -> str:
+    codes: list[str] = []
+
+    def stash(match: re.Match) -> str:
+        codes.append(f"<code>{html.escape(match.group(1), quote=False)}</code>")
+        return _CODE_PLACEHOLDER.format(len(codes) - 1)
+
+    text = _INLINE_CODE.sub(stash, text)
+    text = html.escape(text, quote=False)
+    text = _BOLD.sub(lambda match: f"<strong>{match.group(1) or match.group(2)}</strong>", text)
+    text = _ITALIC.sub(r"<em>\1</em>", text)
+    if codes:
+        text = _CODE_PLACEHOLDER_RE.sub(lambda match: codes[int(match.group(1))], text)
+    return text
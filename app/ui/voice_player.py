@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import tempfile
-from pathlib import Path
+from collections import deque
 
-from PySide6.QtCore import QObject, QUrl, Signal
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QObject, QUrl, Signal
 from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
 
 
@@ -18,42 +17,55 @@ class VoicePlayer(QObject):
         self._player.setAudioOutput(self._audio_output)
         self._player.mediaStatusChanged.connect(self._handle_media_status)
         self._player.errorOccurred.connect(self._handle_error)
-        self._current_path: Path | None = None
+        # 合成した WAV は一時ファイルを介さずメモリ上のバッファから再生する
+        self._buffer = QBuffer(self)
+        # 文ごとに合成された音声を、再生中のものが終わり次第順番に流す
+        self._queue: deque[QByteArray | bytes] = deque()
 
-    def play_bytes(self, wav_bytes: bytes) -> None:
+    def play_bytes(self, wav_bytes: QByteArray | bytes) -> None:
         if not wav_bytes:
             return
         self.stop()
-        self._current_path = self._write_temp_file(wav_bytes)
-        self._player.setSource(QUrl.fromLocalFile(str(self._current_path)))
-        self._player.play()
+        self._start(wav_bytes)
+
+    def enqueue_bytes(self, wav_bytes: QByteArray | bytes) -> None:
+        if not wav_bytes:
+            return
+        if self._buffer.isOpen():
+            self._queue.append(wav_bytes)
+            return
+        self._start(wav_bytes)
 
     def stop(self) -> None:
+        self._queue.clear()
         self._player.stop()
-        self._cleanup_temp()
+        self._release_buffer()
 
-    def _write_temp_file(self, wav_bytes: bytes) -> Path:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as handle:
-            handle.write(wav_bytes)
-            return Path(handle.name)
+    def _start(self, wav_bytes: QByteArray | bytes) -> None:
+        self._buffer.setData(wav_bytes)
+        self._buffer.open(QIODevice.ReadOnly)
+        # URL はフォーマット判定用のヒントとしてだけ使われる
+        self._player.setSourceDevice(self._buffer, QUrl("voice.wav"))
+        self._player.play()
 
-    def _cleanup_temp(self) -> None:
-        if not self._current_path:
+    def _release_buffer(self) -> None:
+        if not self._buffer.isOpen():
             return
-        try:
-            if self._current_path.exists():
-                self._current_path.unlink()
-        except OSError:
-            pass
-        finally:
-            self._current_path = None
+        # プレーヤーからデバイスを外してからバッファを閉じ、音声データを解放する
+        self._player.setSource(QUrl())
+        self._buffer.close()
+        self._buffer.setData(b"")
 
     def _handle_media_status(self, status: QMediaPlayer.MediaStatus) -> None:
         if status == QMediaPlayer.EndOfMedia:
-            self._cleanup_temp()
+            self._release_buffer()
+            if self._queue:
+                self._start(self._queue.popleft())
 
     def _handle_error(self, error) -> None:  # type: ignore[override]
         if error == QMediaPlayer.NoError:
             return
-        self._cleanup_temp()
-        self.error.emit(self._player.errorString())
+        message = self._player.errorString()
+        self._queue.clear()
+        self._release_buffer()
+        self.error.emit(message)
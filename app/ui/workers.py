@@ -2,43 +2,43 @@ from __future__ import annotations
 
 from typing import Iterable
 
-from PySide6.QtCore import QObject, Signal, Slot
+from PySide6.QtCore import QByteArray, QObject, QRunnable, Signal, Slot
 
 from ..llm_client import LocalLLM
 from ..models import ChatMessage
-from ..voicevox_client import VoiceVoxClient
+from ..voicevox_client import VoiceVoxClient, sanitize_voice_text
 
 
 class LLMWorker(QObject):
+    # 推論専用スレッドに常駐し、generate の呼び出しごとに 1 件ずつ応答を生成する
     finished = Signal(str, object)
     failed = Signal(str)
+    sentence_ready = Signal(str)
 
-    def __init__(
+    def __init__(self, client: LocalLLM) -> None:
+        super().__init__()
+        self._client = client
+
+    @Slot(object, object, object, object, bool)
+    def generate(
         self,
-        client: LocalLLM,
         messages: Iterable[ChatMessage],
         system_prompt: str | None,
-        topic_router: object | None = None,
-        topic_state: object | None = None,
+        topic_router: object | None,
+        topic_state: object | None,
+        stream_sentences: bool,
     ) -> None:
-        super().__init__()
-        self._client = client
-        self._messages = list(messages)
-        self._system_prompt = system_prompt
-        self._topic_router = topic_router
-        self._topic_state = topic_state
-
-    @Slot()
-    def run(self) -> None:
+        messages = list(messages)
         try:
             # GUI スレッドを塞がないよう別スレッドで推論を実行
-            system_prompt = self._system_prompt
             topic_update = None
-            if self._topic_router is not None and self._topic_state is not None:
-                result = self._topic_router.build_prompt(self._messages, system_prompt, self._topic_state)
+            if topic_router is not None and topic_state is not None:
+                result = topic_router.build_prompt(messages, system_prompt, topic_state)
                 system_prompt = result.system_prompt
                 topic_update = result.update
-            response = self._client.generate_reply(self._messages, system_prompt)
+            # 音声出力が有効なら、文ができた時点で合成を始められるよう逐次通知する
+            on_sentence = self.sentence_ready.emit if stream_sentences else None
+            response = self._client.generate_reply(messages, system_prompt, on_sentence)
         except Exception as exc:  # pragma: no cover - runtime safety
             self.failed.emit(str(exc))
             return
@@ -56,6 +56,8 @@ class SpeechWorker(QObject):
         sample_rate: int,
         channels: int,
         sample_format: str,
+        already_target: bool = False,
+        stream=None,
     ) -> None:
         super().__init__()
         self._recognizer = recognizer
@@ -63,38 +65,55 @@ class SpeechWorker(QObject):
         self._sample_rate = sample_rate
         self._channels = channels
         self._sample_format = sample_format
+        self._already_target = already_target
+        self._stream = stream
 
-    @Slot()
-    def run(self) -> None:
+    def start(self) -> None:
+        future = self._recognizer.recognize_pcm_async(
+            self._pcm_bytes,
+            self._sample_rate,
+            self._channels,
+            self._sample_format,
+            already_target=self._already_target,
+            stream=self._stream,
+        )
+        self._pcm_bytes = b""
+        self._stream = None
+        future.add_done_callback(self._emit_result)
+
+    def _emit_result(self, future) -> None:
+        # 認識スレッドから呼ばれるが、シグナルは受信側 (GUI スレッド) へキューイングされる
         try:
-            text = self._recognizer.recognize_pcm(
-                self._pcm_bytes,
-                self._sample_rate,
-                self._channels,
-                self._sample_format,
-            )
+            text = future.result()
         except Exception as exc:  # pragma: no cover - runtime safety
             self.failed.emit(str(exc))
             return
         self.recognized.emit(text)
 
 
-class VoiceVoxWorker(QObject):
+class VoiceVoxWorkerSignals(QObject):
     finished = Signal(object, int)
     failed = Signal(str, int)
 
-    def __init__(self, client: VoiceVoxClient, text: str, speaker_id: int, request_id: int) -> None:
+
+class VoiceVoxWorker(QRunnable):
+    def __init__(self, client: VoiceVoxClient, texts: list[str], speaker_id: int, request_id: int) -> None:
         super().__init__()
+        self.signals = VoiceVoxWorkerSignals()
         self._client = client
-        self._text = text
+        self._texts = list(texts)
         self._speaker_id = speaker_id
         self._request_id = request_id
 
-    @Slot()
     def run(self) -> None:
         try:
-            audio = self._client.synthesize(self._text, self._speaker_id)
+            # 読み上げ用の整形も GUI スレッドではなくここで行う
+            texts = [cleaned for cleaned in map(sanitize_voice_text, self._texts) if cleaned]
+            # 溜まっている文はまとめて 1 回の /multi_synthesis で合成する
+            audio = self._client.synthesize_many(texts, self._speaker_id) if texts else []
         except Exception as exc:  # pragma: no cover - runtime safety
-            self.failed.emit(str(exc), self._request_id)
+            self.signals.failed.emit(str(exc), self._request_id)
             return
-        self.finished.emit(audio, self._request_id)
+        # QByteArray へのコピーはこのスレッドで済ませ、GUI スレッドでは暗黙共有のまま QBuffer に渡す
+        clips = [QByteArray(clip) for clip in audio]
+        self.signals.finished.emit(clips, self._request_id)
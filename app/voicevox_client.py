@@ -1,37 +1,230 @@
 from __future__ import annotations
 
+import http.client
 import json
 import re
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from typing import Any
-from urllib.error import HTTPError, URLError
-from urllib.parse import quote
-from urllib.request import Request, urlopen
+from urllib.parse import quote, urlsplit
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional runtime dependency
+    orjson = None
 
 DEFAULT_VOICEVOX_URL = "http://127.0.0.1:50021"
 
+# 保持しておくアイドル接続の上限（同時に走る合成リクエストの数に合わせる）
+_MAX_IDLE_CONNECTIONS = 4
+# 合成済み音声をメモリに保持する上限（相づちや定型文の再合成を避ける）
+_AUDIO_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# 再利用した接続がサーバー側で閉じられていた場合に送られる例外
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+# 読み上げ前に Markdown 記法を取り除く置換（適用順に意味があるため順序を保つ）。
+# 先頭の文字列が含まれていなければその置換は一致し得ないので、正規表現の走査ごと省く。
+_SANITIZE_BEFORE_PIPES = (
+    ("```", re.compile(r"```.*?```", re.DOTALL), " "),
+    ("`", re.compile(r"`[^`]*`"), " "),
+    ("](", re.compile(r"!\[([^\]]*)\]\([^)]+\)"), r"\1"),
+    ("](", re.compile(r"\[([^\]]+)\]\([^)]+\)"), r"\1"),
+    ("<", re.compile(r"<[^>]+>"), " "),
+    (">", re.compile(r"^>+\s?", re.MULTILINE), ""),
+    ("#", re.compile(r"^\s*#{1,6}\s*", re.MULTILINE), ""),
+    (None, re.compile(r"^\s*[-*+]\s+", re.MULTILINE), ""),
+    (".", re.compile(r"^\s*\d+\.\s+", re.MULTILINE), ""),
+)
+_SANITIZE_EMPHASIS = re.compile(r"[*_~]+")
+_SANITIZE_SPACES = re.compile(r"[ \t]+")
+
 
 class VoiceVoxClient:
     def __init__(self, base_url: str = DEFAULT_VOICEVOX_URL) -> None:
         self._base_url = base_url.rstrip("/")
+        parts = urlsplit(self._base_url)
+        self._secure = parts.scheme == "https"
+        self._netloc = parts.netloc
+        self._path_prefix = parts.path
+        # HTTP/1.1 keep-alive で /audio_query と /synthesis、および発話間で TCP 接続を使い回す
+        self._idle_connections: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        # 複数文の /audio_query を並行して投げるためのスレッドプール（必要になるまで作らない）
+        self._query_executor: ThreadPoolExecutor | None = None
+        # (テキスト, 話者) -> WAV。古いものから追い出す LRU
+        self._audio_cache: OrderedDict[tuple[str, int], bytes | bytearray] = OrderedDict()
+        self._audio_cache_bytes = 0
 
-    def synthesize(self, text: str, speaker_id: int) -> bytes:
+    def synthesize(self, text: str, speaker_id: int) -> bytes | bytearray:
         if not text:
             raise ValueError("Text for synthesis is empty.")
-        query = self._audio_query(text, speaker_id)
-        return self._synthesis(query, speaker_id)
+        audio = self._cached_audio(text, speaker_id)
+        if audio is None:
+            query = self._audio_query(text, speaker_id)
+            audio = self._synthesis(query, speaker_id)
+            self._store_audio(text, speaker_id, audio)
+        return audio
+
+    def synthesize_many(self, texts: list[str], speaker_id: int) -> list[bytes | bytearray]:
+        """Synthesize several texts with one /multi_synthesis call, keeping their order."""
+        if not texts or not all(texts):
+            raise ValueError("Text for synthesis is empty.")
+        audios: dict[str, bytes | bytearray | None] = {
+            text: self._cached_audio(text, speaker_id) for text in texts
+        }
+        missing = [text for text, audio in audios.items() if audio is None]
+        if len(missing) == 1:
+            audios[missing[0]] = self.synthesize(missing[0], speaker_id)
+        elif missing:
+            executor = self._ensure_query_executor()
+            queries = list(executor.map(lambda text: self._audio_query(text, speaker_id), missing))
+            for text, audio in zip(missing, self._multi_synthesis(queries, speaker_id)):
+                audios[text] = audio
+                self._store_audio(text, speaker_id, audio)
+        return [audios[text] for text in texts]
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._idle_connections = self._idle_connections, []
+            executor, self._query_executor = self._query_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for connection in connections:
+            connection.close()
 
     def _audio_query(self, text: str, speaker_id: int) -> dict:
         encoded = quote(text, safe="")
-        url = f"{self._base_url}/audio_query?text={encoded}&speaker={speaker_id}"
-        payload = _request_json("POST", url)
+        body = self._request(
+            f"/audio_query?text={encoded}&speaker={speaker_id}",
+            headers={"Accept": "application/json"},
+            timeout=30,
+        )
+        payload = _loads_json(body) if body else None
         if not isinstance(payload, dict):
             raise RuntimeError("Unexpected response from /audio_query.")
         return payload
 
-    def _synthesis(self, query: dict, speaker_id: int) -> bytes:
-        url = f"{self._base_url}/synthesis?speaker={speaker_id}"
-        payload = json.dumps(query).encode("utf-8")
-        return _request_bytes("POST", url, payload)
+    def _synthesis(self, query: dict, speaker_id: int) -> bytes | bytearray:
+        payload = _dumps_json(query)
+        return self._request(
+            f"/synthesis?speaker={speaker_id}",
+            payload,
+            headers={"Content-Type": "application/json"},
+            timeout=60,
+        )
+
+    def _multi_synthesis(self, queries: list[dict], speaker_id: int) -> list[bytes | bytearray]:
+        payload = _dumps_json(queries)
+        archive = self._request(
+            f"/multi_synthesis?speaker={speaker_id}",
+            payload,
+            headers={"Content-Type": "application/json"},
+            timeout=60,
+        )
+        try:
+            with zipfile.ZipFile(BytesIO(archive)) as bundle:
+                # VOICEVOX は 001.wav, 002.wav, ... の連番で格納する
+                names = sorted(name for name in bundle.namelist() if not name.endswith("/"))
+                audios = [bundle.read(name) for name in names]
+        except zipfile.BadZipFile as exc:
+            raise RuntimeError("Unexpected response from /multi_synthesis.") from exc
+        if len(audios) != len(queries):
+            raise RuntimeError("Unexpected response from /multi_synthesis.")
+        return audios
+
+    def _cached_audio(self, text: str, speaker_id: int) -> bytes | bytearray | None:
+        key = (text, speaker_id)
+        with self._lock:
+            audio = self._audio_cache.get(key)
+            if audio is not None:
+                self._audio_cache.move_to_end(key)
+            return audio
+
+    def _store_audio(self, text: str, speaker_id: int, audio: bytes | bytearray) -> None:
+        if len(audio) > _AUDIO_CACHE_MAX_BYTES:
+            return
+        key = (text, speaker_id)
+        with self._lock:
+            previous = self._audio_cache.pop(key, None)
+            if previous is not None:
+                self._audio_cache_bytes -= len(previous)
+            self._audio_cache[key] = audio
+            self._audio_cache_bytes += len(audio)
+            while self._audio_cache_bytes > _AUDIO_CACHE_MAX_BYTES:
+                _, evicted = self._audio_cache.popitem(last=False)
+                self._audio_cache_bytes -= len(evicted)
+
+    def _ensure_query_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._query_executor is None:
+                self._query_executor = ThreadPoolExecutor(
+                    max_workers=_MAX_IDLE_CONNECTIONS, thread_name_prefix="voicevox-query"
+                )
+            return self._query_executor
+
+    def _request(
+        self,
+        path: str,
+        payload: bytes | None = None,
+        *,
+        headers: dict[str, str],
+        timeout: float,
+    ) -> bytes | bytearray:
+        url = self._path_prefix + path
+        connection, reused = self._acquire(timeout)
+        while True:
+            try:
+                connection.request("POST", url, body=payload, headers=headers)
+                response = connection.getresponse()
+                body = _read_body(response)
+            except _STALE_CONNECTION_ERRORS as exc:
+                connection.close()
+                if reused:
+                    # アイドル中にサーバー側で閉じられた接続なら、新しい接続で 1 度だけやり直す
+                    connection, reused = self._connect(timeout), False
+                    continue
+                raise RuntimeError(f"VOICEVOX connection failed: {exc}") from exc
+            except (OSError, http.client.HTTPException) as exc:
+                connection.close()
+                raise RuntimeError(f"VOICEVOX connection failed: {exc}") from exc
+            break
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        if response.status >= 400:
+            raise RuntimeError(f"VOICEVOX error: {response.status} {response.reason}")
+        return body
+
+    def _acquire(self, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle_connections:
+                connection = self._idle_connections.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+        return self._connect(timeout), False
+
+    def _connect(self, timeout: float) -> http.client.HTTPConnection:
+        if self._secure:
+            return http.client.HTTPSConnection(self._netloc, timeout=timeout)
+        return http.client.HTTPConnection(self._netloc, timeout=timeout)
+
+    def _release(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle_connections) < _MAX_IDLE_CONNECTIONS:
+                self._idle_connections.append(connection)
+                return
+        connection.close()
 
 
 def sanitize_voice_text(text: str) -> str:
@@ -39,43 +232,42 @@ def sanitize_voice_text(text: str) -> str:
         return ""
 
     cleaned = text
-    cleaned = re.sub(r"```.*?```", " ", cleaned, flags=re.DOTALL)
-    cleaned = re.sub(r"`[^`]*`", " ", cleaned)
-    cleaned = re.sub(r"!\[([^\]]*)\]\([^)]+\)", r"\1", cleaned)
-    cleaned = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", cleaned)
-    cleaned = re.sub(r"<[^>]+>", " ", cleaned)
-    cleaned = re.sub(r"^>+\s?", "", cleaned, flags=re.MULTILINE)
-    cleaned = re.sub(r"^\s*#{1,6}\s*", "", cleaned, flags=re.MULTILINE)
-    cleaned = re.sub(r"^\s*[-*+]\s+", "", cleaned, flags=re.MULTILINE)
-    cleaned = re.sub(r"^\s*\d+\.\s+", "", cleaned, flags=re.MULTILINE)
-    cleaned = cleaned.replace("|", " ")
-    cleaned = re.sub(r"[*_~]", "", cleaned)
-    cleaned = re.sub(r"[ \t]+", " ", cleaned)
-    cleaned = re.sub(r"\s*\n\s*", "\n", cleaned)
-    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
-    return cleaned.strip()
-
-
-def _request_json(method: str, url: str) -> Any:
-    request = Request(url, headers={"Accept": "application/json"}, method=method)
-    with urlopen(request, timeout=30) as response:
-        body = response.read()
-    if not body:
-        return None
+    for trigger, pattern, replacement in _SANITIZE_BEFORE_PIPES:
+        if trigger is None or trigger in cleaned:
+            cleaned = pattern.sub(replacement, cleaned)
+    cleaned = _SANITIZE_EMPHASIS.sub("", cleaned.replace("|", " "))
+    cleaned = _SANITIZE_SPACES.sub(" ", cleaned)
+    if "\n" not in cleaned:
+        return cleaned.strip()
+    # 改行をまたぐ空白や空行は 1 つの改行にまとめる（各行の前後の空白を落として空行を除く）
+    return "\n".join(line for line in map(str.strip, cleaned.split("\n")) if line)
+
+
+def _read_body(response: http.client.HTTPResponse) -> bytes | bytearray:
+    length = response.length
+    if not length:
+        # 長さ不明・空のレスポンスは read() に任せる（空でも読み切ってレスポンスを閉じる必要がある）
+        return response.read()
+    # 合成した WAV は数百 KB になるため、Content-Length 分を確保して直接読み込み中間コピーを省く
+    buffer = bytearray(length)
+    view = memoryview(buffer)
+    received = 0
+    while received < length:
+        count = response.readinto(view[received:])
+        if not count:
+            raise http.client.IncompleteRead(bytes(view[:received]), length - received)
+        received += count
+    return buffer
+
+
+def _loads_json(body: bytes | bytearray) -> Any:
+    # /audio_query の応答はモーラ単位の情報を含み大きいので、使えるなら orjson で bytes のまま解析する
+    if orjson is not None:
+        return orjson.loads(body)
     return json.loads(body.decode("utf-8"))
 
 
-def _request_bytes(method: str, url: str, payload: bytes) -> bytes:
-    request = Request(
-        url,
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method=method,
-    )
-    try:
-        with urlopen(request, timeout=60) as response:
-            return response.read()
-    except HTTPError as exc:
-        raise RuntimeError(f"VOICEVOX error: {exc.code} {exc.reason}") from exc
-    except URLError as exc:
-        raise RuntimeError(f"VOICEVOX connection failed: {exc.reason}") from exc
+def _dumps_json(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")